@@ -1,12 +1,28 @@
+import hashlib
 import json
-import re
+import logging
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 
 import streamlit as st
-from utils.career_advisor import analyze_resume_with_ai, display_json
-from utils.job_scraper import LinkedInSkillScraper, LinkedInScraper
+from utils.career_advisor import get_career_analysis, json_to_markdown
+from utils.job_index import job_index
+from utils.job_scraper import PEOPLE_EXPERIENCE_LEVELS, JobSearchSpec, LinkedInScraper, jobs_cache, linkedin_guard
+from utils.query_planner import QueryPlanner
+from utils.ranking import JobRanker, posting_key
 from utils.resume_improver import improve_resume
 from utils.resume_parser import extract_resume_text
+from utils.resources import get_http_session
+from utils.resume_preprocessor import prepare_resume
+from utils import tracing
+
+logger = logging.getLogger(__name__)
+tracing.configure_from_env()  # JSON lines / Prometheus exporters, if configured
+
+# When set (e.g. http://127.0.0.1:8080), the Gemini calls are made by serve.py instead of this process
+API_URL = os.environ.get("CAREERGENIE_API_URL")
 
 # Streamlit Configuration
 st.set_page_config(
@@ -16,176 +32,439 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-# Load NLP model
+# Experience level mapping
+EXPERIENCE_LEVELS = {
+    "Internship": 1,
+    "Entry level": 2,
+    "Associate": 3,
+    "Mid-Senior level": 4,
+    "Director": 5,
+    "Executive": 6
+}
 
-st.title("📄 CareerGenie - AI Resume Analyzer")
-uploaded_file = st.file_uploader("Upload Resume", type=["pdf", "docx"])
 
-if uploaded_file:
-    file_name = uploaded_file.name  # Get file name
-    file_extension = file_name.split(".")[-1].lower()
-    resume_text = extract_resume_text(BytesIO(uploaded_file.getvalue()), file_extension)
+TAB_LABELS = [
+    "🎯 Career Information", "🔎 Job Search", "🔧 Skill Search", "📌 Resume Improvement", "🌍 Jobs Outside India",
+    "💼 Search by Experience", "Be an Early Applicant", "👥 People in this role"
+]
+CAREER_TAB, JOB_TAB, SKILL_TAB, IMPROVEMENT_TAB, OUTSIDE_INDIA_TAB, EXPERIENCE_TAB, EARLY_APPLICANT_TAB, PEOPLE_TAB = \
+    TAB_LABELS
+# Best-matching postings shown per expander (the Job Search tab uses its slider instead)
+JOBS_PER_SECTION = 10
+
+
+def jobs_markdown(jobs_list, more_link):
+    """One Markdown block for the postings of one search."""
+    postings = "\n".join(
+        f"- **[{job_item['title']}]({job_item['link']})** at *{job_item['company']}* "
+        f"({job_item['location']}) - ⏳ {job_item['posted']}"
+        for job_item in jobs_list
+    )
+    return f"{postings}\n\n[🔗 View More LinkedIn Jobs]({more_link})"
+
+
+def people_markdown(level_results):
+    """One Markdown block for the profiles found for one job title, a section per experience level."""
+    blocks = []
+    for exp_level in PEOPLE_EXPERIENCE_LEVELS:
+        result = level_results.get(exp_level)
+        if result is None:
+            continue
+        profiles = "\n".join(
+            f"- **[{person['name']}]({person['profile_link']})** - {person['position']} ({person['location']})"
+            for person in result["profiles"]
+        )
+        blocks.append(f"#### {exp_level}\n{profiles}\n\n[🔗 View More on LinkedIn]({result['search_link']})")
+    return "\n\n".join(blocks)
+
+
+def search_section(label, specs=(), not_found_message=None, heading=None, paged=False, people=None):
+    """
+    One expander of a search tab. ``markdown`` (or ``warning``) is filled in by ``fetch_tab``.
+    :param label: Expander label
+    :param specs: JobSearchSpecs whose results are shown together
+    :param not_found_message: Shown when the searches return nothing
+    :param heading: Optional Markdown heading above the expander
+    :param paged: Page through up to ``jobs_per_search`` postings of ``specs[0]`` instead of the first 10
+    :param people: Job title whose LinkedIn profiles are shown instead of postings
+    """
+    return {"label": label, "specs": list(specs), "not_found_message": not_found_message, "heading": heading,
+            "paged": paged, "people": people, "markdown": None, "warning": None}
+
+
+def plan_tab(tab_label, analysis, jobs_per_search):
+    """
+    Describe the expanders of a search tab and the LinkedIn searches behind them, without fetching anything.
+    Returns ``{"label", "subheader", "notes", "sections", "top_k", "shown", "caption", "done"}``; ``notes`` are
+    (st function name, text) pairs, ``top_k`` is the number of postings kept per section and ``shown`` collects
+    the keys of the postings the tab ends up listing.
+    """
+    parsed_response = analysis["parsed_response"]
+    jobs = parsed_response.get("JobTitle", [])
+    skills = parsed_response.get("Skills", [])
+    ExperienceLevel = parsed_response.get("ExperienceLevel", [])
+    tab = {"label": tab_label, "subheader": None, "notes": [], "sections": [], "top_k": JOBS_PER_SECTION,
+           "shown": set(), "caption": None, "done": False}
+    sections = tab["sections"]
+
+    def job_heading(job):
+        return f"### 🔹 {job}"
+
+    if tab_label == JOB_TAB:
+        tab["subheader"] = "🔎 Job Search (India)"
+        tab["top_k"] = jobs_per_search
+        for job in jobs:
+            sections.append(search_section(f"📌 LinkedIn Jobs for {job}", [JobSearchSpec(job)],
+                                           f"No jobs found for {job} on LinkedIn.", job_heading(job),
+                                           paged=jobs_per_search > 10))
+        if not jobs:
+            tab["notes"].append(("warning", "No job recommendations found."))
+
+    elif tab_label == SKILL_TAB:
+        tab["subheader"] = "🔧 Skill-Based Search (India)"
+        for skill in skills:
+            sections.append(search_section(f"📌 LinkedIn Jobs for {skill}", [JobSearchSpec(skill)],
+                                           f"No jobs found for {skill} on LinkedIn.", job_heading(skill)))
+        if not skills:
+            tab["notes"].append(("warning", "No skills found in AI response."))
+
+    elif tab_label == OUTSIDE_INDIA_TAB:
+        tab["subheader"] = "🌍 Jobs Outside India"
+        for job in jobs:
+            sections.append(search_section(f"📌 LinkedIn Jobs for {job}", [JobSearchSpec(job, geo_id=None)],
+                                           f"No jobs found for {job} on LinkedIn.", job_heading(job)))
+        if not jobs:
+            tab["notes"].append(("warning", "No job recommendations found."))
+
+    elif tab_label == EXPERIENCE_TAB:
+        tab["subheader"] = "💼 Search Jobs by Experience Level and Job Profile"
+        tab["notes"].append(("info", ExperienceLevel))
+        selected_levels = [level for level in EXPERIENCE_LEVELS if level in ExperienceLevel]
+        if not selected_levels:
+            tab["notes"].append(("error", "No Experience Preference Selected!"))
+        else:
+            for job in jobs:
+                # One spec per level; the planner merges them into a single "&f_E=1%2C2" request
+                sections.append(search_section(
+                    f"📌 LinkedIn Jobs for {job} ({', '.join(selected_levels)})",
+                    [JobSearchSpec(job, Exp_Level=f"&f_E={EXPERIENCE_LEVELS[level]}") for level in selected_levels],
+                    f"No jobs found for {job} at {', '.join(selected_levels)} level.", job_heading(job)))
+
+    elif tab_label == EARLY_APPLICANT_TAB:
+        for job in jobs:
+            sections.append(search_section(f"📌 LinkedIn Jobs for {job}",
+                                           [JobSearchSpec(job, geo_id=None, EarlyApp=True)],
+                                           f"No jobs found for {job} on LinkedIn.", job_heading(job)))
+        if not jobs:
+            tab["notes"].append(("warning", "No job recommendations found."))
+
+    elif tab_label == PEOPLE_TAB:
+        tab["subheader"] = "👥 People in this role"
+        for job in jobs:
+            sections.append(search_section(f"👥 People working as {job}",
+                                           not_found_message=f"No LinkedIn profiles found for {job}.", people=job))
+        if not jobs:
+            tab["notes"].append(("warning", "No job recommendations found."))
+
+    return tab
+
+
+def fetch_tab(tab, analysis, jobs_per_search, on_update):
+    """
+    Run the LinkedIn searches of a planned tab, filling in each section as its results arrive.
+    :param on_update: Called with a section's index whenever that section changes
+    """
+    sections = tab["sections"]
+    planner = QueryPlanner()
+    paged_sections = []
+    people_sections = {}  # job title -> indexes of its sections (the analysis may list a title twice)
+    for index, section in enumerate(sections):
+        if section["people"]:
+            people_sections.setdefault(section["people"], []).append(index)
+        elif section["paged"]:
+            paged_sections.append(index)
+        else:
+            for spec in section["specs"]:
+                planner.add(index, spec)
+
+    # Everything is requested up front; the generators below only collect the results
+    people_results = LinkedInScraper(list(people_sections)).iter_people(deadline=60.0) if people_sections else ()
+    job_results = planner.fetch() if planner.stats["requested"] else ()
+
+    # Postings are ranked by relevance to the resume; the ranker is shared by all tabs of the analysis
+    if analysis.get("ranker") is None:
+        analysis["ranker"] = JobRanker(analysis["resume_text"], analysis["parsed_response"].get("Skills", []))
+    ranker = analysis["ranker"]
+
+    # Postings listed by tabs opened earlier are left out; the Job Search tab at another slider setting is this tab
+    shown_elsewhere = set().union(*(other["shown"] for other in analysis["tabs"].values()
+                                    if other["done"] and other["label"] != tab["label"]))
+
+    # Sections are drawn as their searches finish, then re-ranked together once the tab is complete
+    section_jobs = {}  # section index -> postings of all its searches
+    more_links = {}  # section index -> "View More" link
+    with tracing.span("job_searches", searches=planner.stats["fetched"]):
+        for targets, linkedin_result in job_results:
+            for index in targets:
+                section = sections[index]
+                if linkedin_result and linkedin_result.get("jobs"):
+                    section_jobs.setdefault(index, []).extend(linkedin_result["jobs"])
+                    more_links.setdefault(index, linkedin_result["apply_link"])
+                    with tracing.span("rank_jobs", postings=len(section_jobs[index])):
+                        jobs_list = ranker.rank(section_jobs[index], tab["top_k"], exclude=shown_elsewhere)
+                    if jobs_list:
+                        section["markdown"] = jobs_markdown(jobs_list, more_links[index])
+                elif index not in section_jobs:
+                    section["warning"] = section["not_found_message"]
+                on_update(index)
+
+    with tracing.span("paged_job_searches", searches=len(paged_sections)):
+        for index in paged_sections:
+            section = sections[index]
+            spec = section["specs"][0]
+            more_link = LinkedInScraper.build_jobs_url(spec.keywords, spec.Exp_Level, spec.geo_id, spec.EarlyApp)
+            jobs_list = []
+            for job_item in LinkedInScraper([]).iter_jobs(spec, limit=jobs_per_search):
+                jobs_list.append(job_item)
+                if len(jobs_list) % 10 == 0:  # Redraw once per result page, not once per posting
+                    section["markdown"] = jobs_markdown(jobs_list, more_link)
+                    on_update(index)
+            if jobs_list:
+                section_jobs[index] = jobs_list
+                more_links[index] = more_link
+                section["markdown"] = jobs_markdown(jobs_list, more_link)
+            else:
+                section["warning"] = section["not_found_message"]
+            on_update(index)
+
+    # A posting found by several searches is listed only under the first section (or tab) that has it
+    if section_jobs:
+        with tracing.span("rank_tab", sections=len(section_jobs)):
+            ranked = ranker.rank_groups({index: section_jobs[index] for index in sorted(section_jobs)},
+                                        tab["top_k"], exclude=shown_elsewhere)
+        for index, jobs_list in ranked.items():
+            section = sections[index]
+            if jobs_list:
+                section["markdown"] = jobs_markdown(jobs_list, more_links[index])
+            else:
+                section["markdown"] = None
+                section["warning"] = "All postings found for this search are already listed above or in another tab."
+            on_update(index)
+        tab["shown"] = {posting_key(job) for jobs_list in ranked.values() for job in jobs_list} - {None}
+
+    with tracing.span("people_searches"):
+        people_found = {job: {} for job in people_sections}
+        for job_title, result in people_results:
+            people_found[job_title][result["experience_level"]] = result
+            for index in people_sections[job_title]:
+                sections[index]["markdown"] = people_markdown(people_found[job_title])
+                on_update(index)
+        for job, level_results in people_found.items():
+            if not level_results:
+                for index in people_sections[job]:
+                    sections[index]["warning"] = sections[index]["not_found_message"]
+                    on_update(index)
+
+    if planner.stats["requested"]:
+        plan_stats = planner.stats
+        tab["caption"] = (f"🔁 {plan_stats['fetched']} LinkedIn requests for {plan_stats['requested']} searches "
+                          f"({plan_stats['saved']} saved by deduplication, "
+                          f"cache hit rate {jobs_cache.stats['hit_rate']:.0%})")
 
-    st.write(f"📂 **Uploaded File:** {file_name}")
-    if st.button("Analyze Resume 📜"):
-        with st.spinner("Analyzing..."):
-            ai_response = analyze_resume_with_ai(resume_text)
 
+def render_section(placeholder, section):
+    """Draw one expander's content into its placeholder: a single Markdown block, a warning or a spinner note."""
+    if section["markdown"]:
+        placeholder.markdown(section["markdown"])
+    elif section["warning"]:
+        placeholder.warning(section["warning"])
+    elif section["people"]:
+        placeholder.info("⏳ Fetching LinkedIn profiles...")
+    else:
+        placeholder.info("⏳ Fetching LinkedIn jobs...")
+
+
+def render_search_tab(tab_label, analysis, jobs_per_search):
+    """Show a search tab, fetching its results the first time it is opened and from the session afterwards."""
+    # Only the Job Search tab depends on the results-per-title slider
+    tab_key = (tab_label, jobs_per_search) if tab_label == JOB_TAB else tab_label
+    tab = analysis["tabs"].get(tab_key)
+    if tab is None:
+        tab = analysis["tabs"][tab_key] = plan_tab(tab_label, analysis, jobs_per_search)
+
+    if tab["subheader"]:
+        st.subheader(tab["subheader"])
+    for kind, text in tab["notes"]:
+        getattr(st, kind)(text)
+    placeholders = []
+    for section in tab["sections"]:
+        if section["heading"]:
+            st.markdown(section["heading"])
+        with st.expander(section["label"]):
+            placeholder = st.empty()
+            render_section(placeholder, section)
+        placeholders.append(placeholder)
+
+    if not tab["done"]:
+        with tracing.trace_run("tab") as trace:
+            try:
+                fetch_tab(tab, analysis, jobs_per_search,
+                          lambda index: render_section(placeholders[index], tab["sections"][index]))
+                tab["done"] = True
+            except Exception as e:
+                logger.exception("Fetching %s failed", tab_label)
+                st.error(f"❌ Unexpected error: {str(e)}")
+        analysis["trace"] = trace
+
+    if tab["caption"]:
+        st.caption(tab["caption"])
+
+
+def render_improvement_tab(analysis):
+    st.subheader("📌 Resume Improvement Suggestions")
+    improvement = analysis["improvement"]
+    if not isinstance(improvement, str):  # Still the future submitted with the analysis
         try:
-            if not ai_response or not ai_response.content.strip():
-                st.error("⚠️ AI response is empty. Please try again.")
-                st.stop()
-
-            cleaned_response = re.sub(r"```json|```", "", ai_response.content.strip())
-            parsed_response = json.loads(cleaned_response)
-
-            career_info = parsed_response.get("CareerInfo", "Career information not found.")
-            jobs = parsed_response.get("JobTitle", [])
-            skills = parsed_response.get("Skills", [])
-            ExperienceLevel = parsed_response.get("ExperienceLevel", [])
-
-            career_tab, job_tab, skill_tab, resume_improvement, job_outside_india, experience_search, early_applicant = st.tabs(
-                [
-                    "🎯 Career Information", "🔎 Job Search", "🔧 Skill Search", "📌 Resume Improvement",
-                    "🌍 Jobs Outside India", "💼 Search by Experience", "Be an Early Applicant"
-                ])
-
-            with career_tab:
-                st.subheader("🎯 Career Information")
-                if isinstance(career_info, dict):
-                    display_json(career_info)  # Directly print within function
-                else:
-                    st.write(career_info)  # Print string normally
-
-            with job_tab:
-                st.subheader("🔎 Job Search (India)")
-                if jobs:
-                    for job in jobs:
-                        st.markdown(f"### 🔹 {job}")
-                        linkedin_scraper = LinkedInScraper([job])
-                        linkedin_results = linkedin_scraper.fetch_jobs()
-                        with st.expander(f"📌 LinkedIn Jobs for {job}"):
-                            if linkedin_results and linkedin_results[0].get("jobs"):
-                                for job_item in linkedin_results[0]["jobs"]:
-                                    st.markdown(
-                                        f"- **[{job_item['title']}]({job_item['link']})** at *{job_item['company']}* "
-                                        f"({job_item['location']}) - ⏳ {job_item['posted']}"
-                                    )
-                                st.markdown(f"[🔗 View More LinkedIn Jobs]({linkedin_results[0]['apply_link']})")
-                            else:
-                                st.warning(f"No jobs found for {job} on LinkedIn.")
-                else:
-                    st.warning("No job recommendations found.")
-
-            with skill_tab:
-                st.subheader("🔧 Skill-Based Search (India)")
-                if skills:
-                    for skill in skills:
-                        st.markdown(f"### 🔹 {skill}")
-                        linkedin_scraper = LinkedInSkillScraper([skill])
-                        linkedin_results = linkedin_scraper.fetch_jobs()
-                        with st.expander(f"📌 LinkedIn Jobs for {skill}"):
-                            if linkedin_results and linkedin_results[0].get("jobs"):
-                                for job_item in linkedin_results[0]["jobs"]:
-                                    st.markdown(
-                                        f"- **[{job_item['title']}]({job_item['link']})** at *{job_item['company']}* "
-                                        f"({job_item['location']}) - ⏳ {job_item['posted']}"
-                                    )
-                                st.markdown(f"[🔗 View More LinkedIn Jobs]({linkedin_results[0]['apply_link']})")
-                            else:
-                                st.warning(f"No jobs found for {skill} on LinkedIn.")
-                else:
-                    st.warning("No skills found in AI response.")
-
-            with resume_improvement:
-                st.subheader("📌 Resume Improvement Suggestions")
-                st.markdown(improve_resume(resume_text))
-
-            with job_outside_india:
-                st.subheader("🌍 Jobs Outside India")
-                if jobs:
-                    for job in jobs:
-                        st.markdown(f"### 🔹 {job}")
-                        linkedin_scraper = LinkedInScraper([job])
-                        linkedin_results = linkedin_scraper.fetch_jobs_OutsideIndia()
-                        with st.expander(f"📌 LinkedIn Jobs for {job}"):
-                            if linkedin_results and linkedin_results[0].get("jobs"):
-                                for job_item in linkedin_results[0]["jobs"]:
-                                    st.markdown(
-                                        f"- **[{job_item['title']}]({job_item['link']})** at *{job_item['company']}* "
-                                        f"({job_item['location']}) - ⏳ {job_item['posted']}"
-                                    )
-                                st.markdown(f"[🔗 View More LinkedIn Jobs]({linkedin_results[0]['apply_link']})")
-                            else:
-                                st.warning(f"No jobs found for {job} on LinkedIn.")
-                else:
-                    st.warning("No job recommendations found.")
-
-            with experience_search:
-                st.subheader("💼 Search Jobs by Experience Level and Job Profile")
-                st.info(ExperienceLevel)
-
-                # Experience level mapping
-                experience_levels = {
-                    "Internship": 1,
-                    "Entry level": 2,
-                    "Associate": 3,
-                    "Mid-Senior level": 4,
-                    "Director": 5,
-                    "Executive": 6
-                }
-
-                # Convert selected experience levels to corresponding numbers
-                ExperienceLevels = [experience_levels[level] for level in ExperienceLevel if level in experience_levels]
-
-                # Error handling if no experience level is selected
-                if not ExperienceLevels:
-                    st.error("No Experience Preference Selected!")
-                else:
-                    for job in jobs:
-                        st.markdown(f"### 🔹 {job}")
-
-                        for exp_level, exp_code in experience_levels.items():
-                            if exp_code in ExperienceLevels:
-                                exp_pref = f"&f_E={exp_code}"  # Unique experience level filter
-                                linkedin_scraper = LinkedInScraper([job])
-                                linkedin_results = linkedin_scraper.fetch_jobs(exp_pref)
-
-                                with st.expander(f"📌 LinkedIn Jobs for {job} ({exp_level})"):
-                                    if linkedin_results and linkedin_results[0].get("jobs"):
-                                        for job_item in linkedin_results[0]["jobs"]:
-                                            st.markdown(
-                                                f"- **[{job_item['title']}]({job_item['link']})** at *{job_item['company']}* "
-                                                f"({job_item['location']}) - ⏳ {job_item['posted']}"
-                                            )
-                                        st.markdown(f"[🔗 View More LinkedIn Jobs]({linkedin_results[0]['apply_link']})")
-                                    else:
-                                        st.warning(f"No jobs found for {job} at {exp_level} level.")
-
-            with early_applicant:
-                if jobs:
-                    for job in jobs:
-                        st.markdown(f"### 🔹 {job}")
-                        linkedin_scraper = LinkedInScraper([job])
-                        linkedin_results = linkedin_scraper.fetch_jobs_for_Early_Applicants()
-                        with st.expander(f"📌 LinkedIn Jobs for {job}"):
-                            if linkedin_results and linkedin_results[0].get("jobs"):
-                                for job_item in linkedin_results[0]["jobs"]:
-                                    st.markdown(
-                                        f"- **[{job_item['title']}]({job_item['link']})** at *{job_item['company']}* "
-                                        f"({job_item['location']}) - ⏳ {job_item['posted']}"
-                                    )
-                                st.markdown(f"[🔗 View More LinkedIn Jobs]({linkedin_results[0]['apply_link']})")
-                            else:
-                                st.warning(f"No jobs found for {job} on LinkedIn.")
-                else:
-                    st.warning("No job recommendations found.")
+            with st.spinner("⏳ Preparing suggestions..."), tracing.span("wait_for_improvement"):
+                improvement = analysis["improvement"] = improvement.result()
+        except Exception as e:
+            logger.exception("Resume improvement failed")
+            st.error(f"❌ Unexpected error: {str(e)}")
+            return
+    st.markdown(improvement)
+
+
+def render_trace(trace):
+    """Debug panel: where the time of the last analysis or tab fetch went."""
+    with st.expander("🐞 Timing breakdown", expanded=True):
+        st.caption(f"Run {trace.run_id}: {trace.duration * 1000:.0f} ms")
+        st.dataframe(trace.breakdown(), hide_index=True)
+        requests_made = [dict(url=record["attrs"]["url"], status=record["attrs"].get("status"),
+                              bytes=record["attrs"].get("bytes"), ms=record["duration_ms"])
+                         for record in trace.spans if record["name"] == "http.get"]
+        if requests_made:
+            st.dataframe(sorted(requests_made, key=lambda row: -row["ms"]), hide_index=True)
+        st.dataframe(trace.counter_rows(), hide_index=True)
+
+
+def render_career_info(career_info, prepared):
+    st.subheader("🎯 Career Information")
+    caption = (f"✂️ Resume sent to Gemini as ~{prepared.tokens:,} tokens "
+               f"(~{prepared.original_tokens - prepared.tokens:,} saved, prepared in {prepared.elapsed_ms:.1f} ms)")
+    if prepared.truncated:
+        caption += f"; shortened to fit: {', '.join(prepared.truncated)}"
+    st.caption(caption)
+    if isinstance(career_info, dict):
+        st.markdown(json_to_markdown(career_info))  # One Markdown block for the whole section
+    else:
+        st.write(career_info)  # Print string normally
+
+
+@st.fragment
+def render_results(analysis, jobs_per_search, show_trace):
+    """
+    Show the stored analysis. Runs as a fragment: switching sections reruns only this function, and only
+    the selected section is computed, the first time it is opened.
+    """
+    active_tab = st.radio("Section", TAB_LABELS, horizontal=True, key="active_tab", label_visibility="collapsed")
+    if active_tab == CAREER_TAB:
+        render_career_info(analysis["parsed_response"].get("CareerInfo", "Career information not found."),
+                           analysis["prepared"])
+    elif active_tab == IMPROVEMENT_TAB:
+        render_improvement_tab(analysis)
+    else:
+        render_search_tab(active_tab, analysis, jobs_per_search)
+
+    if show_trace and analysis.get("trace"):
+        render_trace(analysis["trace"])
+
 
+def analyze_remotely(resume_text):
+    """The analysis and improvement suggestions from serve.py; LinkedIn tabs are still fetched here, on demand."""
+    response = get_http_session().post(f"{API_URL.rstrip('/')}/analyze", timeout=300,
+                                       json={"resume_text": resume_text, "searches": []})
+    if not response.ok:
+        raise RuntimeError(f"Analysis service answered HTTP {response.status_code}: {response.text[:200]}")
+    result = response.json()
+    improvement = result["improvement"] or f"⚠️ No suggestions: {result['improvement_error']}"
+    return result["analysis"], improvement
 
 
+def run_analysis(data, file_extension, resume_id):
+    """
+    Extract the resume and get the career analysis; the improvement suggestions are generated concurrently.
+    With CAREERGENIE_API_URL set, both come from serve.py instead.
+    Returns the analysis to keep in the session, or None if it failed (the error has been shown).
+    """
+    llm_executor = ThreadPoolExecutor(max_workers=1)
+    with tracing.trace_run("analysis") as trace:
+        try:
+            resume_text = extract_resume_text(BytesIO(data), file_extension)
+            # Both prompts get the same cleaned, token-budgeted text; ranking uses the full text
+            prepared = prepare_resume(resume_text)
+
+            if API_URL:
+                with st.spinner("Analyzing..."):
+                    parsed_response, improvement = analyze_remotely(resume_text)
+            else:
+                # The improvement suggestions don't depend on the analysis, so they are generated concurrently
+                improvement = llm_executor.submit(tracing.bind(improve_resume), prepared.text)
+                with st.spinner("Analyzing..."):
+                    parsed_response = get_career_analysis(prepared.text)
 
+            if not parsed_response:
+                st.error("⚠️ AI response is empty. Please try again.")
+                return None
+
+            # Demand counts decide what job_refresh_worker.py keeps warm in the local job index
+            try:
+                for job in parsed_response.get("JobTitle", []):
+                    job_index.record_request("title", job)
+                for skill in parsed_response.get("Skills", []):
+                    job_index.record_request("skill", skill)
+            except sqlite3.Error as e:
+                logger.warning("Could not record search demand: %s", e)
 
         except json.JSONDecodeError as e:
             st.error(f"⚠️ JSON parsing error: {str(e)}")
+            return None
         except Exception as e:
-            st.error(f"❌ Unexpected error: {str(e)}")
\ No newline at end of file
+            logger.exception("Analysis failed")
+            st.error(f"❌ Unexpected error: {str(e)}")
+            return None
+        finally:
+            llm_executor.shutdown(wait=False)
+
+    return {
+        "resume_id": resume_id,
+        "resume_text": resume_text,
+        "prepared": prepared,
+        "parsed_response": parsed_response,
+        "improvement": improvement,  # A future until the Resume Improvement tab has waited for it
+        "ranker": None,
+        "tabs": {},  # Planned and fetched search tabs, by tab label
+        "trace": trace,
+    }
+
+
+st.title("📄 CareerGenie - AI Resume Analyzer")
+jobs_per_search = st.sidebar.slider("Job Search results per title", min_value=10, max_value=200, value=10, step=10)
+with st.sidebar.expander("📶 LinkedIn traffic"):
+    st.json(linkedin_guard.metrics)
+show_trace = st.sidebar.checkbox("🐞 Show timing breakdown")
+uploaded_file = st.file_uploader("Upload Resume", type=["pdf", "docx"])
+
+if uploaded_file:
+    file_name = uploaded_file.name  # Get file name
+    file_extension = file_name.split(".")[-1].lower()
+    resume_data = uploaded_file.getvalue()
+    resume_id = hashlib.sha256(resume_data).hexdigest()
+
+    st.write(f"📂 **Uploaded File:** {file_name}")
+    if st.button("Analyze Resume 📜"):
+        # Results live in the session, so later interactions re-render them instead of re-running the analysis
+        st.session_state["analysis"] = run_analysis(resume_data, file_extension, resume_id)
+
+    analysis = st.session_state.get("analysis")
+    if analysis and analysis["resume_id"] == resume_id:
+        render_results(analysis, jobs_per_search, show_trace)
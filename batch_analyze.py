@@ -0,0 +1,363 @@
+"""
+Analyze a directory or archive (.zip, .tar, .tar.gz) of PDF/DOCX resumes without the Streamlit UI.
+
+Text is extracted in a process pool and the Gemini calls run with bounded concurrency. The
+LinkedIn searches of each batch of resumes are planned together, so resumes that share job titles
+or skills share their requests. Each resume becomes one JSON line in the output file, written and
+synced as soon as its last search returns (or it fails): rerunning the same command after a crash
+skips resumes (by content hash) that are already in the output.
+
+    python batch_analyze.py resumes/ --out results.jsonl
+    python batch_analyze.py campus_drive.zip --out results.jsonl --parquet results.parquet --llm-concurrency 8
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import tarfile
+import time
+import zipfile
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from utils import resume_parser
+from utils.career_advisor import get_career_analysis
+from utils.query_planner import SEARCH_KINDS, QueryPlanner, plan_searches
+from utils.ranking import JobRanker
+from utils.resume_improver import improve_resume
+from utils.resume_parser import extract_resume_text
+from utils.resume_preprocessor import prepare_resume
+
+RESUME_EXTENSIONS = ("pdf", "docx")
+
+
+def _extension(name):
+    return name.rsplit(".", 1)[-1].lower() if "." in name else ""
+
+
+def _read_file(file_path):
+    with open(file_path, "rb") as resume_file:
+        return resume_file.read()
+
+
+def iter_resume_sources(path):
+    """
+    Yield ``(name, file_extension, read_bytes)`` for every PDF/DOCX resume in a directory (recursively)
+    or in a .zip/.tar archive, in a stable order. ``read_bytes()`` loads the file when called.
+    """
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for file_name in sorted(files):
+                if _extension(file_name) in RESUME_EXTENSIONS:
+                    file_path = os.path.join(root, file_name)
+                    yield (os.path.relpath(file_path, path), _extension(file_name),
+                           lambda file_path=file_path: _read_file(file_path))
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in sorted(archive.infolist(), key=lambda info: info.filename):
+                if not info.is_dir() and _extension(info.filename) in RESUME_EXTENSIONS:
+                    yield info.filename, _extension(info.filename), lambda info=info: archive.read(info)
+    elif tarfile.is_tarfile(path):
+        with tarfile.open(path) as archive:
+            for member in sorted(archive.getmembers(), key=lambda member: member.name):
+                if member.isfile() and _extension(member.name) in RESUME_EXTENSIONS:
+                    yield (member.name, _extension(member.name),
+                           lambda member=member: archive.extractfile(member).read())
+    else:
+        raise ValueError(f"{path} is not a directory, .zip or .tar archive")
+
+
+def load_completed(output_path, retry_errors=False):
+    """
+    Content hashes already recorded in ``output_path`` (only successful ones with ``retry_errors``).
+    A line cut short by a crash is removed so new records start on a fresh line.
+    """
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, "rb+") as output_file:
+        data = output_file.read()
+        if data and not data.endswith(b"\n"):
+            output_file.truncate(data.rfind(b"\n") + 1)
+            data = data[:data.rfind(b"\n") + 1]
+    for line in data.splitlines():
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if record.get("status") == "ok" or not retry_errors:
+            completed.add(record["sha256"])
+    return completed
+
+
+def _init_extract_worker():
+    # Each worker already handles a whole resume; splitting long PDFs across more processes would oversubscribe
+    resume_parser.PARALLEL_PAGE_THRESHOLD = float("inf")
+
+
+class BatchAnalyzer:
+    """Runs the CareerGenie pipeline over many resumes, appending one JSON record per resume to ``output_path``."""
+
+    def __init__(self, output_path, workers=None, llm_concurrency=4, batch_size=50, search_kinds=("job", "skill"),
+                 jobs_per_search=10, improve=True, fetch_deadline=300.0, retry_errors=False, token_budget=None):
+        """
+        :param output_path: JSON lines file; existing records are kept and their resumes skipped
+        :param workers: Extraction processes (default: CPU count)
+        :param llm_concurrency: Maximum Gemini calls in flight
+        :param batch_size: Resumes whose LinkedIn searches are planned and deduplicated together
+        :param search_kinds: Which of the app's job searches to run (see SEARCH_KINDS)
+        :param jobs_per_search: Best-matching postings kept per search
+        :param improve: Also generate resume improvement suggestions
+        :param fetch_deadline: Seconds allowed for each batch's LinkedIn requests
+        :param retry_errors: Analyze resumes again whose earlier record is an error
+        :param token_budget: Resume tokens sent to Gemini (default: utils.resume_preprocessor.DEFAULT_TOKEN_BUDGET)
+        """
+        self.output_path = output_path
+        self.workers = workers or os.cpu_count() or 1
+        self.llm_concurrency = llm_concurrency
+        self.batch_size = batch_size
+        self.search_kinds = tuple(search_kinds)
+        self.jobs_per_search = jobs_per_search
+        self.improve = improve
+        self.fetch_deadline = fetch_deadline
+        self.retry_errors = retry_errors
+        self.token_budget = token_budget
+        self._extract_pool = None
+        self.counters = {"processed": 0, "skipped": 0, "failed": 0, "searches_requested": 0, "searches_fetched": 0}
+
+    def _pending(self, sources, completed):
+        """Read each source once, skipping resumes (by content hash) that are done or seen earlier in this run."""
+        for name, file_extension, read_bytes in sources:
+            data = read_bytes()
+            sha256 = hashlib.sha256(data).hexdigest()
+            if sha256 in completed:
+                self.counters["skipped"] += 1
+                continue
+            completed.add(sha256)
+            yield {"file": name, "sha256": sha256, "file_extension": file_extension, "data": data}
+
+    def _chunks(self, items):
+        chunk = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) == self.batch_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _extract_in_process(self, item):
+        future = Future()
+        try:
+            future.set_result(extract_resume_text(item["data"], item["file_extension"]))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def _submit_extraction(self, item):
+        if self._extract_pool is not None:
+            try:
+                return self._extract_pool.submit(extract_resume_text, item["data"], item["file_extension"])
+            except BrokenProcessPool:
+                self._use_in_process_extraction()
+        return self._extract_in_process(item)
+
+    def _use_in_process_extraction(self):
+        print("Extraction process pool failed; extracting in this process from now on")
+        self._extract_pool.shutdown(wait=False, cancel_futures=True)
+        self._extract_pool = None
+
+    def _analyze_chunk(self, chunk, llm_pool, write):
+        """
+        Extract and analyze one chunk; each resume goes to Gemini as soon as its text is ready.
+        :param write: Called with each resume that failed, as soon as it did
+        """
+        extractions = {self._submit_extraction(item): item for item in chunk}
+        llm_calls = []
+        for future in as_completed(extractions):
+            item = extractions[future]
+            try:
+                try:
+                    item["text"] = future.result()
+                except BrokenProcessPool:
+                    if self._extract_pool is not None:
+                        self._use_in_process_extraction()
+                    item["text"] = self._extract_in_process(item).result()
+            except Exception as e:
+                item["error"] = f"Text extraction failed: {e}"
+                write(item)
+                continue
+            if not item["text"]:
+                item["error"] = "No text found in the resume"
+                write(item)
+                continue
+            item["prepared"] = prepare_resume(item["text"], self.token_budget)  # Shared by both prompts
+            item["analysis_future"] = llm_pool.submit(get_career_analysis, item["prepared"].text)
+            if self.improve:
+                item["improvement_future"] = llm_pool.submit(improve_resume, item["prepared"].text)
+            llm_calls.append(item)
+
+        for item in llm_calls:
+            try:
+                item["analysis"] = item.pop("analysis_future").result()
+                if item["analysis"] is None:
+                    item["error"] = "AI response is empty"
+            except Exception as e:
+                item["error"] = f"Analysis failed: {e}"
+            if self.improve:
+                try:
+                    item["improvement"] = item.pop("improvement_future").result()
+                except Exception as e:
+                    item["improvement_error"] = str(e)
+            if "error" in item:
+                write(item)
+
+    def _search_chunk(self, chunk, write):
+        """
+        Run the chunk's LinkedIn searches once each and keep every resume's best matches.
+        :param write: Called with each analyzed resume as soon as its last search has returned
+        """
+        planner = QueryPlanner()
+        analyzed = [item for item in chunk if "error" not in item]
+        for index, item in enumerate(analyzed):
+            item["jobs"] = {kind: {} for kind in self.search_kinds}
+            plan_searches(planner, index, item["analysis"], self.search_kinds)
+        if not analyzed:
+            return
+
+        stats = planner.stats
+        self.counters["searches_requested"] += stats["requested"]
+        self.counters["searches_fetched"] += stats["fetched"]
+        outstanding = [0] * len(analyzed)
+        for index, kind, term in planner.targets:  # Terms in the order each analysis lists them
+            analyzed[index]["jobs"][kind][term] = []
+            outstanding[index] += 1
+        for index, item in enumerate(analyzed):
+            if not outstanding[index]:
+                self._finish(item, write)
+        for targets, linkedin_result in planner.fetch(deadline=self.fetch_deadline):
+            jobs_list = linkedin_result["jobs"] if linkedin_result else []
+            for index, kind, term in targets:
+                analyzed[index]["jobs"][kind][term].extend(jobs_list)
+                outstanding[index] -= 1
+                if not outstanding[index]:
+                    self._finish(analyzed[index], write)
+
+    def _finish(self, item, write):
+        # A posting found for several terms of a kind is kept under the first one, as in the app's tabs
+        ranker = JobRanker(item["text"], item["analysis"].get("Skills", []))
+        for kind, groups in item["jobs"].items():
+            item["jobs"][kind] = ranker.rank_groups(groups, self.jobs_per_search)
+        write(item)
+
+    def _write(self, output_file, item, started):
+        """Append one resume's record and sync it to disk, so a crash loses only resumes still in flight."""
+        del item["data"]
+        record = self._record(item, started)
+        output_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        output_file.flush()
+        os.fsync(output_file.fileno())
+        self.counters["processed" if record["status"] == "ok" else "failed"] += 1
+
+    def _record(self, item, started):
+        record = {
+            "file": item["file"],
+            "sha256": item["sha256"],
+            "status": "error" if "error" in item else "ok",
+            "chars": len(item.get("text") or ""),
+            "prompt_tokens": item["prepared"].tokens if "prepared" in item else None,
+            "tokens_saved": item["prepared"].original_tokens - item["prepared"].tokens if "prepared" in item else None,
+            "analysis": item.get("analysis"),
+            "improvement": item.get("improvement"),
+            "jobs": item.get("jobs"),
+            "elapsed_seconds": round(time.monotonic() - started, 2),
+        }
+        for field in ("error", "improvement_error"):
+            if field in item:
+                record[field] = item[field]
+        return record
+
+    def run(self, sources):
+        """
+        Process every resume from ``sources`` (``(name, file_extension, read_bytes)`` tuples, e.g. from
+        ``iter_resume_sources``) that is not in the output yet. Returns the counters.
+        """
+        completed = load_completed(self.output_path, self.retry_errors)
+        started = time.monotonic()
+        # "spawn" like utils.resume_parser: forking a process that already runs LLM and HTTP threads is unsafe
+        self._extract_pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_extract_worker,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        llm_pool = ThreadPoolExecutor(max_workers=self.llm_concurrency, thread_name_prefix="llm")
+        try:
+            with open(self.output_path, "a", encoding="utf-8") as output_file:
+                for chunk in self._chunks(self._pending(sources, completed)):
+                    chunk_started = time.monotonic()
+                    write = partial(self._write, output_file, started=chunk_started)
+                    self._analyze_chunk(chunk, llm_pool, write)
+                    self._search_chunk(chunk, write)
+                    done = self.counters["processed"] + self.counters["failed"]
+                    print(f"{done} resumes analyzed ({self.counters['failed']} failed, "
+                          f"{self.counters['skipped']} already done) in {time.monotonic() - started:.0f}s; "
+                          f"{self.counters['searches_fetched']} distinct LinkedIn searches for "
+                          f"{self.counters['searches_requested']} requested")
+        finally:
+            if self._extract_pool is not None:
+                self._extract_pool.shutdown(cancel_futures=True)
+            llm_pool.shutdown(cancel_futures=True)
+        return self.counters
+
+
+def write_parquet(jsonl_path, parquet_path):
+    """
+    Convert the JSON lines output to Parquet, keeping the latest record per resume.
+    Nested fields (analysis, jobs) are stored as JSON strings.
+    """
+    import pandas as pd  # Installed with Streamlit
+
+    records = {}
+    with open(jsonl_path, encoding="utf-8") as jsonl_file:
+        for line in jsonl_file:
+            if line.strip():
+                record = json.loads(line)
+                records[record["sha256"]] = record
+    frame = pd.DataFrame.from_records(list(records.values()))
+    for column in ("analysis", "jobs"):
+        if column in frame:
+            frame[column] = frame[column].map(lambda value: json.dumps(value, ensure_ascii=False))
+    frame.to_parquet(parquet_path, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="Directory, .zip or .tar archive of PDF/DOCX resumes")
+    parser.add_argument("--out", default="careergenie_results.jsonl", help="JSON lines output (appended to)")
+    parser.add_argument("--parquet", help="Also write the complete results to this Parquet file")
+    parser.add_argument("--workers", type=int, default=None, help="Text extraction processes (default: CPU count)")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="Maximum Gemini calls in flight")
+    parser.add_argument("--batch-size", type=int, default=50, help="Resumes whose job searches are shared")
+    parser.add_argument("--searches", nargs="+", choices=SEARCH_KINDS, default=["job", "skill"],
+                        help="Which job searches to run for each resume")
+    parser.add_argument("--jobs-per-search", type=int, default=10)
+    parser.add_argument("--no-improve", action="store_true", help="Skip the resume improvement suggestions")
+    parser.add_argument("--fetch-deadline", type=float, default=300.0, help="Seconds allowed per batch of searches")
+    parser.add_argument("--retry-errors", action="store_true", help="Analyze resumes that failed in earlier runs again")
+    parser.add_argument("--token-budget", type=int, default=None, help="Estimated resume tokens sent to Gemini")
+    args = parser.parse_args()
+
+    analyzer = BatchAnalyzer(args.out, workers=args.workers, llm_concurrency=args.llm_concurrency,
+                             batch_size=args.batch_size, search_kinds=args.searches,
+                             jobs_per_search=args.jobs_per_search, improve=not args.no_improve,
+                             fetch_deadline=args.fetch_deadline, retry_errors=args.retry_errors,
+                             token_budget=args.token_budget)
+    counters = analyzer.run(iter_resume_sources(args.input))
+    print(f"Done: {counters}")
+    if args.parquet:
+        write_parquet(args.out, args.parquet)
+        print(f"Wrote {args.parquet}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Per-page parse time of LinkedIn job and people search pages: the original html.parser
+implementations versus utils.card_parser.parse_job_cards and parse_people_cards.
+
+Run from the repository root:
+    python -m benchmarks.bench_card_parser [--repeat 50]
+"""
+import argparse
+import os
+import statistics
+import time
+
+from bs4 import BeautifulSoup
+
+from utils.card_parser import canonical_job_link, parse_job_cards, parse_people_cards
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+JOBS_FIXTURE = os.path.join(FIXTURES_DIR, "linkedin_jobs_search.html")
+PEOPLE_FIXTURE = os.path.join(FIXTURES_DIR, "linkedin_people_search.html")
+
+
+def legacy_parse_job_cards(markup):
+    """The parser LinkedInScraper.fetch_jobs used before utils.card_parser existed."""
+    soup = BeautifulSoup(markup, "html.parser")
+    jobs = soup.select("div.base-card")[:10]
+
+    return [
+        {
+            "title": job.find("h3").get_text(strip=True) if job.find("h3") else "No Title",
+            "company": job.find("h4").get_text(strip=True) if job.find("h4") else "Unknown Company",
+            "location": job.select_one("span.job-search-card__location").get_text(strip=True) if job.select_one(
+                "span.job-search-card__location") else "No Location",
+            "posted": job.find("time").get_text(strip=True) if job.find("time") else "Unknown Time",
+            "link": job.find("a")["href"] if job.find("a") and job.find("a").has_attr("href") else "No Link",
+        }
+        for job in jobs
+    ]
+
+
+def legacy_parse_people_cards(markup):
+    """The parser LinkedInScraper.fetch_people used before utils.card_parser.parse_people_cards existed."""
+    soup = BeautifulSoup(markup, "html.parser")
+    people = soup.find_all("div", class_="reusable-search__entity-result")[:10]
+
+    return [
+        {
+            "name": person.find("span", class_="entity-result__title-text").get_text(
+                strip=True) if person.find("span", class_="entity-result__title-text") else "No Name",
+            "position": person.find("div", class_="entity-result__primary-subtitle").get_text(
+                strip=True) if person.find("div",
+                                           class_="entity-result__primary-subtitle") else "No Position",
+            "location": person.find("div", class_="entity-result__secondary-subtitle").get_text(
+                strip=True) if person.find("div",
+                                           class_="entity-result__secondary-subtitle") else "No Location",
+            "profile_link": f"https://www.linkedin.com{person.find('a')['href']}" if person.find(
+                "a") and person.find("a").has_attr("href") else "No Profile Link"
+        }
+        for person in people
+    ]
+
+
+def time_parser(parse, markup, repeat):
+    """Return per-call timings in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(markup)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def parsers_agree(legacy, current):
+    """
+    Same cards and fields. The new people parser drops the screen-reader text the old one appended to
+    names, and the new job parser returns canonical job links instead of the tracking hrefs.
+    """
+    if len(legacy) != len(current):
+        return False
+    for old, new in zip(legacy, current):
+        if "name" in new and not old["name"].startswith(new["name"]):
+            return False
+        if "link" in old and old["link"] != "No Link":
+            old = dict(old, link=canonical_job_link(old["link"]))
+        if {k: v for k, v in old.items() if k != "name"} != {k: v for k, v in new.items() if k != "name"}:
+            return False
+    return True
+
+
+def benchmark_page(fixture_path, legacy_parse, parse, repeat):
+    with open(fixture_path, "rb") as fixture:
+        page_bytes = fixture.read()
+    page_text = page_bytes.decode("utf-8")
+
+    if not parsers_agree(legacy_parse(page_text), parse(page_bytes)):
+        raise SystemExit(f"Parsers disagree on {os.path.basename(fixture_path)}; "
+                         "fix utils/card_parser.py before benchmarking")
+
+    runs = [
+        ("html.parser (before)", legacy_parse, page_text),
+        ("lxml + SoupStrainer, str", parse, page_text),
+        ("lxml + SoupStrainer, bytes (after)", parse, page_bytes),
+    ]
+    print(f"Fixture: {os.path.basename(fixture_path)} ({len(page_bytes) / 1024:.0f} KiB), {repeat} runs each")
+    baseline = None
+    for name, parse_page, markup in runs:
+        timings = time_parser(parse_page, markup, repeat)
+        median = statistics.median(timings)
+        baseline = baseline or median
+        print(f"{name:<38} median {median:7.2f} ms   min {min(timings):7.2f} ms   speed-up {baseline / median:4.1f}x")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--repeat", type=int, default=50, help="Parses per implementation")
+    args = arg_parser.parse_args()
+
+    benchmark_page(JOBS_FIXTURE, legacy_parse_job_cards, parse_job_cards, args.repeat)
+    print()
+    benchmark_page(PEOPLE_FIXTURE, legacy_parse_people_cards, parse_people_cards, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+Offline end-to-end benchmark of the analysis pipeline.
+
+Each analysis is one resume with every job search, as batch_analyze.py runs it: extraction, the
+Gemini analysis with the improvement suggestions in parallel, then the LinkedIn searches of all job
+tabs at once (deduplicated) and ranking. In the app, "Analyze Resume" only covers the first two
+steps; each tab's searches start when it is opened. Runs against benchmarks.fake_linkedin and
+benchmarks.fake_llm, with caches and the job index in a temporary directory. Scenarios:
+
+    e2e         one analysis per corpus resume (1-60 pages, PDF and DOCX), cold caches
+    cold-warm   the same resumes analyzed twice in a row: cold caches, then warm
+    concurrent  --users analyses started at once (cold, then warm)
+    async       the same load through utils.pipeline on a single event loop (cold, then warm)
+
+Run from the repository root:
+    python -m benchmarks.bench_pipeline [--scenario all] [--users 50] [--http-latency 0.08] [--error-rate 0.02]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = tempfile.mkdtemp(prefix="careergenie-bench-")
+# Must be set before utils.cache and utils.job_index are imported: their default paths are read at import
+os.environ["CAREERGENIE_CACHE_DB"] = os.path.join(BENCH_DIR, "cache.sqlite3")
+os.environ["CAREERGENIE_JOB_INDEX"] = os.path.join(BENCH_DIR, "job_index.sqlite3")
+
+from benchmarks.fake_linkedin import FakeLinkedInServer, linkedin_base_urls, route_linkedin_to
+from benchmarks.fake_llm import FakeChatModel
+from benchmarks.resume_corpus import DEFAULT_PAGE_COUNTS, corpus, make_resume
+
+from utils import career_advisor, resume_improver, tracing
+from utils.career_advisor import analysis_cache, get_career_analysis
+from utils.job_index import job_index
+from utils.job_scraper import jobs_cache, linkedin_guard, people_cache
+from utils.pipeline import analyze_resume_pipeline
+from utils.query_planner import SEARCH_KINDS, QueryPlanner, plan_searches
+from utils.ranking import JobRanker
+from utils.resources import get_http_session, new_async_http_session
+from utils.resume_improver import improve_resume, improvement_cache
+from utils.resume_parser import clear_text_cache, extract_resume_text
+from utils.resume_preprocessor import clear_prepared_cache, prepare_resume
+
+def install_fake_llm(model):
+    """Make the analysis and improvement modules talk to ``model`` instead of Gemini."""
+    career_advisor.get_llm = lambda *args: model
+    resume_improver.get_llm = lambda *args: model
+
+
+def reset_caches():
+    """Cold start: empty every cache tier and the local job index."""
+    for cache in (jobs_cache, people_cache, analysis_cache, improvement_cache):
+        cache.invalidate()
+    job_index.clear()
+    clear_text_cache()
+    clear_prepared_cache()
+
+
+def analyze(data, file_extension):
+    """
+    Analyze one resume and run all of its job searches. Returns the finished trace run plus the time
+    until the first search's postings were ranked, in seconds.
+    """
+    llm_executor = ThreadPoolExecutor(max_workers=1)
+    with tracing.trace_run("benchmark") as trace:
+        started = time.perf_counter()
+        try:
+            resume_text = extract_resume_text(data, file_extension)
+            prepared = prepare_resume(resume_text)
+            improvement_future = llm_executor.submit(tracing.bind(improve_resume), prepared.text)
+
+            analysis = get_career_analysis(prepared.text) or {}
+            planner = QueryPlanner()
+            plan_searches(planner, 0, analysis, SEARCH_KINDS)
+            job_results = planner.fetch()
+
+            first_result = None
+            ranker = JobRanker(resume_text, analysis.get("Skills", []))
+            for _, linkedin_result in job_results:
+                if linkedin_result and linkedin_result.get("jobs"):
+                    first_result = first_result or time.perf_counter() - started
+                    with tracing.span("rank_jobs", postings=len(linkedin_result["jobs"])):
+                        ranker.rank(linkedin_result["jobs"])
+            improvement_future.result()
+        finally:
+            llm_executor.shutdown(wait=False)
+    return trace, first_result
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def summarize(label, runs, wall_time):
+    """Print p50/p95 latency, time to first job result and throughput for ``(trace, first_result)`` runs."""
+    print_latencies(label, [trace.duration * 1000 for trace, _ in runs],
+                    [first * 1000 for _, first in runs if first is not None], wall_time)
+
+
+def print_latencies(label, latencies, first_results, wall_time):
+    line = (f"{label:<28} n={len(latencies):<3} p50 {percentile(latencies, 0.5):8.0f} ms   "
+            f"p95 {percentile(latencies, 0.95):8.0f} ms   ")
+    if first_results:
+        line += f"first jobs p50 {percentile(first_results, 0.5):7.0f} ms   "
+    line += f"{len(latencies) / wall_time:6.2f} analyses/s"
+    print(line)
+
+
+def print_stages(runs):
+    """Median time per stage across runs (stages summed within a run)."""
+    totals = {}
+    for trace, _ in runs:
+        for stage in trace.breakdown():
+            totals.setdefault(stage["span"], []).append(stage["total_ms"])
+    for name, values in sorted(totals.items(), key=lambda item: -statistics.median(item[1])):
+        print(f"    {name:<22} p50 {statistics.median(values):8.1f} ms   p95 {percentile(values, 0.95):8.1f} ms")
+
+
+def run_sequential(label, resumes, show_stages=False):
+    started = time.perf_counter()
+    runs = [analyze(data, file_extension) for _, file_extension, data in resumes]
+    summarize(label, runs, time.perf_counter() - started)
+    if show_stages:
+        print_stages(runs)
+    return runs
+
+
+def run_concurrent(label, resumes, show_stages=False):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(resumes), thread_name_prefix="user") as users:
+        futures = [users.submit(analyze, data, file_extension) for _, file_extension, data in resumes]
+        runs = [future.result() for future in futures]
+    summarize(label, runs, time.perf_counter() - started)
+    if show_stages:
+        print_stages(runs)
+    return runs
+
+
+def scenario_e2e(args, server):
+    print("\n== e2e: one analysis per corpus resume, cold caches ==")
+    for name, file_extension, data in corpus(args.pages):
+        reset_caches()
+        trace, first_result = analyze(data, file_extension)
+        extract_ms = sum(stage["total_ms"] for stage in trace.breakdown() if stage["span"] == "resume.extract")
+        first_ms = f"{first_result * 1000:6.0f} ms" if first_result is not None else "     -   "
+        preprocess = next(record for record in trace.spans if record["name"] == "resume.preprocess")
+        print(f"{name:<18} {len(data) / 1024:6.0f} KiB   total {trace.duration * 1000:7.0f} ms   "
+              f"extract {extract_ms:7.1f} ms   first jobs {first_ms}   "
+              f"tokens {preprocess['attrs']['original_tokens']:6d} -> {preprocess['attrs']['tokens']:5d} "
+              f"({preprocess['duration_ms']:.1f} ms)")
+
+
+def scenario_cold_warm(args, server):
+    print(f"\n== cold-warm: {args.resumes} resumes analyzed one after another, twice ==")
+    resumes = [(f"user-{seed}", "pdf", make_resume(seed, 2, "pdf")) for seed in range(args.resumes)]
+    reset_caches()
+    run_sequential("cold", resumes, show_stages=args.stages)
+    run_sequential("warm", resumes, show_stages=args.stages)
+
+
+def scenario_concurrent(args, server):
+    print(f"\n== concurrent: {args.users} users at once ==")
+    formats = ("pdf", "docx")
+    resumes = [(f"user-{seed}", formats[seed % 2], make_resume(1000 + seed, 1 + seed % 3, formats[seed % 2]))
+               for seed in range(args.users)]
+    reset_caches()
+    run_concurrent("cold", resumes, show_stages=args.stages)
+    run_concurrent("warm", resumes, show_stages=args.stages)
+
+
+def scenario_async(args, server):
+    print(f"\n== async: {args.users} analyses at once on one event loop ==")
+    formats = ("pdf", "docx")
+    resumes = [(formats[seed % 2], make_resume(1000 + seed, 1 + seed % 3, formats[seed % 2]))
+               for seed in range(args.users)]
+    reset_caches()
+
+    async def run_all():
+        async with new_async_http_session() as session:
+            for label in ("cold", "warm"):
+                started = time.perf_counter()
+                results = await asyncio.gather(*(
+                    analyze_resume_pipeline(data, file_extension, session=session, search_kinds=SEARCH_KINDS)
+                    for file_extension, data in resumes))
+                print_latencies(label, [result["elapsed_ms"] for result in results], [],
+                                time.perf_counter() - started)
+
+    with linkedin_base_urls(server):
+        asyncio.run(run_all())
+
+
+SCENARIOS = {"e2e": scenario_e2e, "cold-warm": scenario_cold_warm, "concurrent": scenario_concurrent,
+             "async": scenario_async}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=["all", *SCENARIOS], default="all")
+    parser.add_argument("--users", type=int, default=50, help="Simultaneous users in the concurrent scenario")
+    parser.add_argument("--resumes", type=int, default=10, help="Resumes in the cold-warm scenario")
+    parser.add_argument("--pages", type=int, nargs="+", default=list(DEFAULT_PAGE_COUNTS),
+                        help="Resume lengths in the e2e scenario")
+    parser.add_argument("--http-latency", type=float, default=0.08, help="Seconds per fake LinkedIn response")
+    parser.add_argument("--http-jitter", type=float, default=0.04, help="Extra random seconds per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of HTTP 503 responses")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of HTTP 429 responses")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Seconds to the fake LLM's first token")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=150.0)
+    parser.add_argument("--linkedin-rate", type=float, default=None,
+                        help="Override the shared LinkedIn rate limit (requests/s); the production value by default")
+    parser.add_argument("--stages", action="store_true", help="Also print per-stage p50/p95")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)  # Failed fetches are summarized from the error counters instead
+    if args.linkedin_rate:
+        linkedin_guard.max_rate = linkedin_guard.bucket.rate = args.linkedin_rate
+        linkedin_guard.bucket.capacity = max(linkedin_guard.bucket.capacity, args.linkedin_rate)
+    install_fake_llm(FakeChatModel(first_token_latency=args.llm_latency,
+                                   tokens_per_second=args.llm_tokens_per_second))
+
+    server = FakeLinkedInServer(latency=args.http_latency, jitter=args.http_jitter, error_rate=args.error_rate,
+                                throttle_rate=args.throttle_rate, seed=args.seed)
+    with server:
+        route_linkedin_to(get_http_session(), server)
+        print(f"Python {sys.version.split()[0]}, {os.cpu_count()} CPUs; fake LinkedIn at {server.base_url} "
+              f"({args.http_latency * 1000:.0f}+{args.http_jitter * 1000:.0f} ms), "
+              f"fake LLM first token {args.llm_latency:.2f} s; state in {BENCH_DIR}")
+        for name, scenario in SCENARIOS.items():
+            if args.scenario in ("all", name):
+                scenario(args, server)
+
+    print(f"\nFake LinkedIn: {server.counters}")
+    print(f"LinkedIn guard: {linkedin_guard.metrics}")
+    errors = {dict(labels).get("stage", "?") + "/" + dict(labels).get("error", "?"): count
+              for (name, labels), count in tracing.metrics.counters.items() if name == "errors"}
+    print(f"Errors: {errors or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Local stand-in for LinkedIn's job and people search pages, serving the recorded fixtures.
+
+Latency, server errors and throttling (429 with Retry-After) can be injected, so the scraper's
+fan-out, rate limiter and caches can be measured without touching linkedin.com:
+
+    with FakeLinkedInServer(latency=0.08, error_rate=0.02) as server:
+        route_linkedin_to(get_http_session(), server)
+        ...
+
+The async pipeline's aiohttp requests don't go through a requests adapter; ``linkedin_base_urls``
+points the scraper's URLs at the server instead.
+"""
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from requests.adapters import HTTPAdapter
+
+from utils.job_scraper import LinkedInScraper
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+JOBS_FIXTURE = os.path.join(FIXTURES_DIR, "linkedin_jobs_search.html")
+PEOPLE_FIXTURE = os.path.join(FIXTURES_DIR, "linkedin_people_search.html")
+JOB_ID = re.compile(rb"\b(\d{10})\b")
+
+
+class FakeLinkedInServer:
+    """Threaded HTTP server answering /jobs/search, the paged jobs-guest endpoint and /search/results/people."""
+
+    def __init__(self, latency=0.05, jitter=0.02, error_rate=0.0, throttle_rate=0.0, retry_after=1,
+                 max_results=100, seed=0):
+        """
+        :param latency: Seconds added to every response
+        :param jitter: Extra random delay, uniform in [0, jitter]
+        :param error_rate: Fraction of requests answered with HTTP 503
+        :param throttle_rate: Fraction of requests answered with HTTP 429
+        :param retry_after: Retry-After seconds sent with injected 429s
+        :param max_results: Paged job requests with ``start`` at or beyond this get an empty page
+        :param seed: Seed for the error injection and jitter
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.max_results = max_results
+        self.counters = {"requests": 0, "errors": 0, "throttled": 0, "bytes": 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        with open(JOBS_FIXTURE, "rb") as fixture:
+            self._jobs_page = fixture.read()
+        with open(PEOPLE_FIXTURE, "rb") as fixture:
+            self._people_page = fixture.read()
+        self._server = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _draw(self):
+        with self._lock:
+            self.counters["requests"] += 1
+            return self._random.random(), self._random.uniform(0, self.jitter)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def _jobs_body(self, query):
+        """The jobs fixture with posting ids shifted per search and page, so every search has its own postings."""
+        start = int(query.get("start", ["0"])[0])
+        if start >= self.max_results:
+            return b""
+        search = repr(sorted((name, values) for name, values in query.items() if name != "start"))
+        offset = int(hashlib.sha256(search.encode("utf-8")).hexdigest()[:6], 16) * 1000 + start
+        return JOB_ID.sub(lambda match: str((int(match.group(1)) + offset) % 10 ** 10).zfill(10).encode(),
+                          self._jobs_page)
+
+    def respond(self, path, query):
+        """Return ``(status, headers, body)`` for one request."""
+        draw, delay = self._draw()
+        time.sleep(self.latency + delay)
+        if draw < self.throttle_rate:
+            self._count("throttled")
+            return 429, {"Retry-After": str(self.retry_after)}, b""
+        if draw < self.throttle_rate + self.error_rate:
+            self._count("errors")
+            return 503, {}, b""
+        if path.startswith("/jobs"):
+            body = self._jobs_body(query)
+        elif path.startswith("/search/results/people"):
+            body = self._people_page
+        else:
+            return 404, {}, b""
+        self._count("bytes", len(body))
+        return 200, {"Content-Type": "text/html; charset=utf-8"}, body
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like the real site
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                status, headers, body = server.respond(parts.path, parse_qs(parts.query))
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="fake-linkedin", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class RedirectAdapter(HTTPAdapter):
+    """Transport adapter that sends requests for one site to another base URL, keeping path and query."""
+
+    def __init__(self, target_base_url, **kwargs):
+        self.target_base_url = target_base_url.rstrip("/")
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.url = f"{self.target_base_url}{parts.path}?{parts.query}"
+        return super().send(request, **kwargs)
+
+
+def route_linkedin_to(session, server):
+    """Point a requests session's LinkedIn traffic at ``server`` (other hosts are untouched)."""
+    retries = session.get_adapter("https://www.linkedin.com/").max_retries  # Keep the production retry policy
+    adapter = RedirectAdapter(server.base_url, pool_connections=4, pool_maxsize=32, max_retries=retries)
+    session.mount("https://www.linkedin.com/", adapter)
+    return adapter
+
+
+@contextmanager
+def linkedin_base_urls(server):
+    """Build LinkedInScraper URLs against ``server`` inside the block (for clients other than requests)."""
+    names = ("BASE_URL_JOBS", "BASE_URL_JOBS_PAGES", "BASE_URL_PEOPLE")
+    saved = {name: getattr(LinkedInScraper, name) for name in names}
+    for name, url in saved.items():
+        setattr(LinkedInScraper, name, url.replace("https://www.linkedin.com", server.base_url))
+    try:
+        yield
+    finally:
+        for name, url in saved.items():
+            setattr(LinkedInScraper, name, url)
@@ -0,0 +1,127 @@
+"""
+Deterministic stand-in for ChatGoogleGenerativeAI.
+
+Answers the career analysis prompt with canned JSON and the improvement prompt with canned Markdown,
+after a configurable time to first token and at a configurable output rate. The job titles and skills
+depend on a hash of the resume, so different resumes lead to different (but repeatable) job searches.
+"""
+import asyncio
+import hashlib
+import json
+import time
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from utils.job_scraper import PEOPLE_EXPERIENCE_LEVELS
+
+JOB_TITLES = ["Data Scientist", "Machine Learning Engineer", "Data Analyst", "Backend Engineer", "DevOps Engineer",
+              "Cloud Architect", "Frontend Developer", "Full Stack Developer", "Data Engineer", "QA Engineer",
+              "Product Analyst", "Site Reliability Engineer"]
+SKILLS = ["Python", "SQL", "AWS", "Docker", "Kubernetes", "React", "Spark", "TensorFlow", "Java", "Go", "Terraform",
+          "Tableau"]
+EXPERIENCE_LEVELS = list(PEOPLE_EXPERIENCE_LEVELS)
+
+IMPROVEMENT_ANSWER = """## Resume Improvement Suggestions
+
+### ATS formatting
+- Use standard section headings (Summary, Experience, Education, Skills).
+- Replace tables and columns with a single-column layout.
+
+### Grammar
+- Keep bullet points in the past tense for previous roles.
+
+### Stronger wording
+- Lead each bullet with an action verb and quantify the outcome (e.g. "Cut report latency by 40%").
+
+### Skills
+- Group skills by category and list the most relevant ones for your target role first.
+"""
+
+
+def _pick(options, seed, count):
+    """``count`` distinct options chosen deterministically from ``seed``."""
+    chosen = []
+    for index in range(len(options)):
+        option = options[(seed + index * 7) % len(options)]
+        if option not in chosen:
+            chosen.append(option)
+        if len(chosen) == count:
+            break
+    return chosen
+
+
+def analysis_answer(prompt, titles=3, skills=3):
+    """The canned career analysis for a prompt, as the model would write it (fenced JSON)."""
+    seed = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16)
+    analysis = {
+        "JobTitle": _pick(JOB_TITLES, seed, titles),
+        "Skills": _pick(SKILLS, seed // 13, skills),
+        "ExperienceLevel": EXPERIENCE_LEVELS[1 + seed % 3:3 + seed % 3],
+        "CareerInfo": {
+            "Summary": "Engineer with hands-on experience building and shipping data products. " * 8,
+            "Roles": ["Apply for roles that combine software engineering with data work."] * 5,
+            "FocusSkills": ["Deepen cloud deployment and monitoring skills."] * 5,
+            "ProjectIdeas": ["Build an end-to-end project with a public dataset and a deployed API."] * 5,
+        },
+    }
+    return "```json\n" + json.dumps(analysis, indent=4) + "\n```"
+
+
+class FakeChatModel:
+    """Implements the parts of the LangChain chat model interface the app uses: invoke, stream and their async forms."""
+
+    def __init__(self, first_token_latency=1.0, tokens_per_second=150.0, chars_per_token=4, titles=3, skills=3):
+        """
+        :param first_token_latency: Seconds before the first chunk (or the whole answer for ``invoke``)
+        :param tokens_per_second: Output rate after the first token
+        :param chars_per_token: Used to turn the answer length into a token count
+        :param titles: Number of job titles in the analysis answer
+        :param skills: Number of skills in the analysis answer
+        """
+        self.first_token_latency = first_token_latency
+        self.tokens_per_second = tokens_per_second
+        self.chars_per_token = chars_per_token
+        self.titles = titles
+        self.skills = skills
+
+    def _answer(self, prompt):
+        if "Resume Improvement" in prompt:
+            return IMPROVEMENT_ANSWER
+        return analysis_answer(prompt, self.titles, self.skills)
+
+    def _usage(self, prompt, answer):
+        input_tokens = len(prompt) // self.chars_per_token
+        output_tokens = len(answer) // self.chars_per_token
+        return {"input_tokens": input_tokens, "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens}
+
+    def _chunks(self, prompt):
+        """``(delay, chunk)`` pairs covering the whole answer."""
+        answer = self._answer(prompt)
+        usage = self._usage(prompt, answer)
+        chunk_chars = self.chars_per_token * 8
+        delay = chunk_chars / self.chars_per_token / self.tokens_per_second
+        for start in range(0, len(answer), chunk_chars):
+            chunk = AIMessageChunk(content=answer[start:start + chunk_chars],
+                                   usage_metadata=usage if start == 0 else None)  # Usage is reported once
+            yield (self.first_token_latency if start == 0 else delay), chunk
+
+    def invoke(self, prompt, **kwargs):
+        answer = self._answer(prompt)
+        time.sleep(self.first_token_latency + len(answer) / self.chars_per_token / self.tokens_per_second)
+        return AIMessage(content=answer, usage_metadata=self._usage(prompt, answer))
+
+    def stream(self, prompt, **kwargs):
+        for delay, chunk in self._chunks(prompt):
+            time.sleep(delay)
+            yield chunk
+
+    async def ainvoke(self, prompt, **kwargs):
+        answer = self._answer(prompt)
+        await asyncio.sleep(self.first_token_latency + len(answer) / self.chars_per_token / self.tokens_per_second)
+        return AIMessage(content=answer, usage_metadata=self._usage(prompt, answer))
+
+    async def astream(self, prompt, **kwargs):
+        for delay, chunk in self._chunks(prompt):
+            await asyncio.sleep(delay)
+            yield chunk
@@ -0,0 +1,89 @@
+"""
+Background worker that keeps the local job index warm.
+
+On a schedule it re-scrapes LinkedIn for the job titles and skills users request most often and
+stores the postings in utils.job_index, so the app's tabs are served from the index instead of
+scraping live on every analysis.
+
+    python job_refresh_worker.py --top 20 --interval 1800
+    python job_refresh_worker.py --once
+"""
+import argparse
+import logging
+import time
+
+from utils.fanout import FanOutScheduler
+from utils.job_index import job_index
+from utils.job_scraper import JobSearchSpec, LinkedInScraper, canonical_search_key, jobs_cache
+from utils.resources import get_http_session
+
+logger = logging.getLogger(__name__)
+
+EXPERIENCE_CODES = range(1, 7)  # Internship .. Executive
+
+
+def refresh_specs(titles, skills):
+    """Every search the app's tabs run for these titles and skills, one experience level at a time."""
+    specs = []
+    for title in titles:
+        specs.append(JobSearchSpec(title))  # Job Search (India)
+        specs.append(JobSearchSpec(title, geo_id=None))  # Jobs Outside India
+        specs.append(JobSearchSpec(title, geo_id=None, EarlyApp=True))  # Be an Early Applicant
+        specs.extend(JobSearchSpec(title, Exp_Level=f"&f_E={code}") for code in EXPERIENCE_CODES)
+    specs.extend(JobSearchSpec(skill) for skill in skills)  # Skill Search
+    return specs
+
+
+def refresh_once(top, max_workers, per_host_limit, deadline):
+    titles = job_index.top_requested("title", top)
+    skills = job_index.top_requested("skill", top)
+    specs = refresh_specs(titles, skills)
+    if not specs:
+        print("No searches recorded yet; nothing to refresh.")
+        return
+
+    scraper = LinkedInScraper([])
+    session = get_http_session()
+    scheduler = FanOutScheduler(max_workers=max_workers, per_host_limit=per_host_limit, deadline=deadline)
+    for spec in specs:
+        linkedin_url = scraper.build_jobs_url(spec.keywords, spec.Exp_Level, spec.geo_id, spec.EarlyApp)
+        scheduler.submit(linkedin_url, linkedin_url, scraper._download_job_page, session, linkedin_url)
+
+    refreshed = 0
+    for linkedin_url, jobs_list in scheduler.results():
+        if jobs_list is None:
+            continue
+        query_key = canonical_search_key(linkedin_url)
+        job_index.store(query_key, jobs_list)
+        jobs_cache.set(query_key, jobs_list)
+        refreshed += 1
+    print(f"Refreshed {refreshed}/{len(specs)} searches for {len(titles)} titles and {len(skills)} skills.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=20, help="How many of the most requested titles and skills to refresh")
+    parser.add_argument("--interval", type=float, default=1800, help="Seconds between refresh runs")
+    parser.add_argument("--once", action="store_true", help="Run a single refresh and exit")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent requests per run")
+    parser.add_argument("--per-host-limit", type=int, default=2, help="Concurrent requests to LinkedIn")
+    parser.add_argument("--deadline", type=float, default=600, help="Seconds allowed per refresh run")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    while True:
+        started = time.monotonic()
+        try:
+            refresh_once(args.top, args.workers, args.per_host_limit, args.deadline)
+        except Exception:
+            if args.once:
+                raise
+            # A locked index or a failed scrape loses this run only; the next one starts on schedule
+            logger.exception("Refresh run failed")
+        if args.once:
+            break
+        time.sleep(max(args.interval - (time.monotonic() - started), 0))
+
+
+if __name__ == "__main__":
+    main()
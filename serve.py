@@ -0,0 +1,143 @@
+"""
+Local HTTP service around utils.pipeline: one process, one event loop, many concurrent analyses.
+
+    python serve.py --port 8080
+    curl -F resume=@cv.pdf "http://127.0.0.1:8080/analyze?searches=job,skill"
+    curl -H "Content-Type: application/json" -d '{"resume_text": "...", "searches": []}' \
+        http://127.0.0.1:8080/analyze
+
+Endpoints:
+    POST /analyze   A multipart upload (field "resume") or JSON with "resume_text". Options, in the query
+                    string or the JSON body: searches (comma-separated kinds from SEARCH_KINDS, empty for
+                    none), jobs_per_search, improve (true/false). Answers with utils.pipeline's result as JSON.
+    GET  /health
+    GET  /metrics   Prometheus text from utils.tracing
+
+The Gemini key is read from GEMINI_API_KEY (or .streamlit/secrets.toml). Set CAREERGENIE_API_URL for
+app.py to make the Streamlit app send its Gemini work here.
+"""
+import argparse
+import asyncio
+import json
+import logging
+
+import aiohttp
+from aiohttp import web
+
+from utils import tracing
+from utils.pipeline import AnalysisError, analyze_resume_pipeline
+from utils.query_planner import SEARCH_KINDS
+from utils.resources import new_async_http_session
+
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+
+HTTP_SESSION = web.AppKey("http_session", aiohttp.ClientSession)
+ANALYSIS_SLOTS = web.AppKey("analysis_slots", asyncio.Semaphore)
+
+logger = logging.getLogger(__name__)
+
+
+def parse_options(values):
+    """Pipeline keyword arguments from query parameters or a JSON body; raises ValueError for bad values."""
+    searches = values.get("searches", "job,skill")
+    if isinstance(searches, str):
+        searches = [kind.strip() for kind in searches.split(",") if kind.strip()]
+    if not isinstance(searches, list) or not all(isinstance(kind, str) for kind in searches):
+        raise ValueError("\"searches\" must be a comma-separated string or a list of strings")
+    unknown = set(searches) - set(SEARCH_KINDS)
+    if unknown:
+        raise ValueError(f"Unknown searches: {', '.join(sorted(unknown))} (choose from {', '.join(SEARCH_KINDS)})")
+
+    jobs_per_search = values.get("jobs_per_search", 10)
+    if isinstance(jobs_per_search, str) and jobs_per_search.strip().isdigit():
+        jobs_per_search = int(jobs_per_search)
+    if isinstance(jobs_per_search, bool) or not isinstance(jobs_per_search, int) or jobs_per_search < 1:
+        raise ValueError("\"jobs_per_search\" must be a positive integer")
+
+    improve = values.get("improve", True)
+    if isinstance(improve, str):
+        improve = improve.lower() not in ("0", "false", "no")
+    if not isinstance(improve, bool):
+        raise ValueError("\"improve\" must be true or false")
+    return {"search_kinds": tuple(searches), "jobs_per_search": jobs_per_search, "with_improvement": improve}
+
+
+async def read_resume(request):
+    """Return ``(resume arguments for the pipeline, option values)`` from an upload or a JSON body."""
+    if request.content_type == "application/json":
+        body = await request.json()
+        if not isinstance(body, dict) or not isinstance(body.get("resume_text"), str):
+            raise ValueError("The JSON body needs a \"resume_text\" string")
+        return {"resume_text": body["resume_text"]}, {**request.query, **body}
+    if request.content_type == "multipart/form-data":
+        form = await request.post()
+        upload = form.get("resume")
+        if not isinstance(upload, web.FileField):
+            raise ValueError("Upload the resume in a form field named \"resume\"")
+        file_extension = upload.filename.rsplit(".", 1)[-1].lower() if "." in upload.filename else ""
+        return {"data": upload.file.read(), "file_extension": file_extension}, request.query
+    raise ValueError("Send the resume as multipart/form-data or as JSON with \"resume_text\"")
+
+
+async def analyze(request):
+    try:
+        resume, options = await read_resume(request)
+        pipeline_options = parse_options(options)
+    except ValueError as e:  # Includes malformed JSON
+        return web.json_response({"error": str(e)}, status=400)
+
+    async with request.app[ANALYSIS_SLOTS]:
+        try:
+            result = await analyze_resume_pipeline(**resume, session=request.app[HTTP_SESSION], **pipeline_options)
+        except (AnalysisError, json.JSONDecodeError) as e:
+            return web.json_response({"error": f"Analysis failed: {e}"}, status=502)
+        except ValueError as e:  # Unsupported file format
+            return web.json_response({"error": str(e)}, status=400)
+        except Exception as e:
+            logger.exception("Analysis failed")
+            return web.json_response({"error": f"Unexpected error: {e}"}, status=500)
+    return web.json_response(result, dumps=lambda value: json.dumps(value, ensure_ascii=False))
+
+
+async def health(request):
+    return web.json_response({"status": "ok"})
+
+
+async def metrics(request):
+    return web.Response(text=tracing.metrics.render_prometheus(), content_type="text/plain")
+
+
+async def http_session(app):
+    """One aiohttp session (connection pool) for every analysis of the service's lifetime."""
+    async with new_async_http_session() as session:
+        app[HTTP_SESSION] = session
+        yield
+
+
+def create_app(max_concurrent=32):
+    """
+    :param max_concurrent: Analyses run at once; further requests wait for a slot
+    """
+    app = web.Application(client_max_size=MAX_UPLOAD_BYTES)
+    app[ANALYSIS_SLOTS] = asyncio.Semaphore(max_concurrent)
+    app.cleanup_ctx.append(http_session)
+    app.router.add_post("/analyze", analyze)
+    app.router.add_get("/health", health)
+    app.router.add_get("/metrics", metrics)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-concurrent", type=int, default=32, help="Analyses run at once")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    tracing.configure_from_env()  # JSON lines / Prometheus exporters, if configured
+    web.run_app(create_app(args.max_concurrent), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
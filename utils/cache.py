@@ -0,0 +1,194 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from utils import tracing
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.environ.get("CAREERGENIE_CACHE_DB", os.path.join(".cache", "careergenie.sqlite3"))
+
+
+def content_key(*parts):
+    """Stable hash of text parts, with whitespace runs collapsed so trivial reformatting still hits."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(re.sub(r"\s+", " ", str(part)).strip().encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier cache for JSON-serializable results: an in-process LRU in front of a SQLite table.
+
+    Entries are fresh for ``ttl`` seconds. After that, and until ``ttl + stale_ttl``, they are still
+    served by ``get_or_fetch`` while a background thread refreshes them (stale-while-revalidate).
+    """
+
+    def __init__(self, namespace, ttl=3600, stale_ttl=6 * 3600, max_entries=256, max_disk_entries=5000,
+                 db_path=DEFAULT_DB_PATH):
+        """
+        :param namespace: Name of the SQLite table holding this cache's entries
+        :param ttl: Seconds an entry is served without revalidation
+        :param stale_ttl: Extra seconds a stale entry may be served while it is refreshed
+        :param max_entries: Size of the in-memory LRU tier
+        :param max_disk_entries: Size of the on-disk tier (oldest entries are evicted); 0 disables it
+        :param db_path: SQLite file for the on-disk tier
+        """
+        if not re.fullmatch(r"\w+", namespace):
+            raise ValueError(f"Invalid cache namespace: {namespace!r}")
+        self.namespace = namespace
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.db_path = db_path
+        self.counters = {"hits": 0, "stale_hits": 0, "misses": 0, "disk_hits": 0, "refreshes": 0}
+
+        self._memory = OrderedDict()  # key -> (value, stored_at)
+        self._lock = threading.RLock()
+        self._refreshing = set()
+        self._db = None
+
+    def _connection(self):
+        if self._db is None and self.max_disk_entries:
+            try:
+                if os.path.dirname(self.db_path):
+                    os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+                self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+                self._db.execute(
+                    f"CREATE TABLE IF NOT EXISTS {self.namespace} "
+                    "(key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)"
+                )
+                self._db.execute(
+                    f"CREATE INDEX IF NOT EXISTS {self.namespace}_stored_at ON {self.namespace} (stored_at)"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning("Disk cache unavailable (%s): %s", self.db_path, e)
+                self.max_disk_entries = 0
+        return self._db
+
+    def _lookup(self, key):
+        """Return ``(value, stored_at)`` from memory or disk, or None."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+            db = self._connection()
+            if db is None:
+                return None
+            row = db.execute(f"SELECT value, stored_at FROM {self.namespace} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            entry = (json.loads(row[0]), row[1])
+            self.counters["disk_hits"] += 1
+            self._remember(key, entry)
+            return entry
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _age(self, entry):
+        return time.time() - entry[1]
+
+    def get(self, key):
+        """Return the fresh value for ``key``, or None."""
+        entry = self._lookup(key)
+        if entry is not None and self._age(entry) <= self.ttl:
+            self.counters["hits"] += 1
+            return entry[0]
+        self.counters["misses"] += 1
+        return None
+
+    def get_stale(self, key):
+        """Return the cached value for ``key`` regardless of its age, or None."""
+        entry = self._lookup(key)
+        return entry[0] if entry is not None else None
+
+    def set(self, key, value):
+        entry = (value, time.time())
+        with self._lock:
+            self._remember(key, entry)
+            db = self._connection()
+            if db is None:
+                return
+            db.execute(f"INSERT OR REPLACE INTO {self.namespace} (key, value, stored_at) VALUES (?, ?, ?)",
+                       (key, json.dumps(value), entry[1]))
+            db.execute(
+                f"DELETE FROM {self.namespace} WHERE key IN (SELECT key FROM {self.namespace} "
+                "ORDER BY stored_at DESC LIMIT -1 OFFSET ?)", (self.max_disk_entries,)
+            )
+            db.commit()
+
+    def invalidate(self, key=None):
+        """Drop ``key``, or every entry in this namespace when no key is given."""
+        with self._lock:
+            db = self._connection()
+            if key is None:
+                self._memory.clear()
+                if db is not None:
+                    db.execute(f"DELETE FROM {self.namespace}")
+            else:
+                self._memory.pop(key, None)
+                if db is not None:
+                    db.execute(f"DELETE FROM {self.namespace} WHERE key = ?", (key,))
+            if db is not None:
+                db.commit()
+
+    def _refresh(self, key, loader):
+        try:
+            value = loader()
+            if value is not None:
+                self.set(key, value)
+                self.counters["refreshes"] += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get_or_fetch(self, key, loader):
+        """
+        Return the cached value for ``key``, calling ``loader()`` on a miss.
+        Stale entries are returned immediately and refreshed in the background.
+        ``None`` results from the loader are not cached.
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            age = self._age(entry)
+            if age <= self.ttl:
+                self.counters["hits"] += 1
+                tracing.incr("cache_lookups", cache=self.namespace, result="hit")
+                return entry[0]
+            if age <= self.ttl + self.stale_ttl:
+                self.counters["stale_hits"] += 1
+                tracing.incr("cache_lookups", cache=self.namespace, result="stale")
+                with self._lock:
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        threading.Thread(target=self._refresh, args=(key, loader), daemon=True).start()
+                return entry[0]
+
+        self.counters["misses"] += 1
+        tracing.incr("cache_lookups", cache=self.namespace, result="miss")
+        value = loader()
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    @property
+    def stats(self):
+        """Hit/miss counters plus the current size of the memory tier."""
+        lookups = self.counters["hits"] + self.counters["stale_hits"] + self.counters["misses"]
+        hit_rate = (self.counters["hits"] + self.counters["stale_hits"]) / lookups if lookups else 0.0
+        return dict(self.counters, memory_entries=len(self._memory), hit_rate=round(hit_rate, 3))
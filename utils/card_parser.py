@@ -0,0 +1,83 @@
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Only the job cards are turned into a tree; the rest of the search page (scripts, nav, footer) is skipped.
+# The strainer sees the raw class attribute, so match "base-card" as one of its whitespace-separated words.
+JOB_CARD_STRAINER = SoupStrainer("div", class_=re.compile(r"(^|\s)base-card(\s|$)"))
+
+
+# "/jobs/view/data-analyst-at-infosys-3956126116" or "/jobs/view/3956126116": the trailing number is the job id
+JOB_VIEW_ID = re.compile(r"/jobs/view/(?:[^/?#]*-)?(\d+)/?(?:[?#]|$)")
+
+
+def _text(tag, default):
+    return tag.get_text(strip=True) if tag is not None else default
+
+
+def canonical_job_link(href):
+    """
+    One URL per LinkedIn job. Search results link to the same posting with per-search tracking
+    parameters (``?position=…&refId=…&trackingId=…``) and the country subdomain of the search, so
+    postings are identified by ``https://www.linkedin.com/jobs/view/<id>/``; other links lose their query.
+    """
+    match = JOB_VIEW_ID.search(href)
+    if match:
+        return f"https://www.linkedin.com/jobs/view/{match.group(1)}/"
+    return href.split("?", 1)[0].split("#", 1)[0]
+
+
+def parse_job_cards(markup, limit=10):
+    """
+    Extract job postings from a LinkedIn job search page.
+    :param markup: Page HTML as bytes (e.g. ``response.content``) or str; lxml detects the encoding of bytes
+    :param limit: Maximum number of cards to return (None for all)
+    :return: List of {"title", "company", "location", "posted", "link"} dicts; see canonical_job_link
+    """
+    soup = BeautifulSoup(markup, "lxml", parse_only=JOB_CARD_STRAINER)
+    cards = soup.find_all("div", class_="base-card", limit=limit)
+
+    jobs_list = []
+    for card in cards:
+        link = card.find("a", href=True)
+        jobs_list.append({
+            "title": _text(card.find("h3"), "No Title"),
+            "company": _text(card.find("h4"), "Unknown Company"),
+            "location": _text(card.find("span", class_="job-search-card__location"), "No Location"),
+            "posted": _text(card.find("time"), "Unknown Time"),
+            "link": canonical_job_link(link["href"]) if link is not None else "No Link",
+        })
+    return jobs_list
+
+
+PEOPLE_CARD_STRAINER = SoupStrainer("div", class_=re.compile(r"(^|\s)reusable-search__entity-result(\s|$)"))
+
+
+def _person_name(title):
+    if title is None:
+        return "No Name"
+    # The visible name is aria-hidden; its sibling repeats it for screen readers ("View X's profile")
+    visible = title.find("span", attrs={"aria-hidden": "true"})
+    return _text(visible if visible is not None else title, "No Name")
+
+
+def parse_people_cards(markup, limit=10):
+    """
+    Extract profiles from a LinkedIn people search page, looking each field up once per card.
+    :param markup: Page HTML as bytes or str
+    :param limit: Maximum number of cards to return (None for all)
+    :return: List of {"name", "position", "location", "profile_link"} dicts
+    """
+    soup = BeautifulSoup(markup, "lxml", parse_only=PEOPLE_CARD_STRAINER)
+    cards = soup.find_all("div", class_="reusable-search__entity-result", limit=limit)
+
+    people_list = []
+    for card in cards:
+        link = card.find("a", href=True)
+        people_list.append({
+            "name": _person_name(card.find("span", class_="entity-result__title-text")),
+            "position": _text(card.find("div", class_="entity-result__primary-subtitle"), "No Position"),
+            "location": _text(card.find("div", class_="entity-result__secondary-subtitle"), "No Location"),
+            "profile_link": f"https://www.linkedin.com{link['href']}" if link is not None else "No Profile Link",
+        })
+    return people_list
@@ -1,35 +1,37 @@
-import streamlit as st
-from langchain_google_genai import ChatGoogleGenerativeAI
+import asyncio
 import json
+import re
+import time
 
-gemini_api_key = st.secrets["GEMINI_API_KEY"]
+from utils.cache import ResultCache, content_key
+from utils.resources import get_llm
+from utils.stream_parser import IncrementalJSONParser
+from utils import tracing
 
 
-def display_json(data, indent=0):
-    """Recursively display JSON keys and values using Streamlit."""
+def json_to_markdown(data, depth=0):
+    """Markdown for a (nested) JSON object: top-level keys in bold, everything below them as nested bullets."""
+    pad = "    " * max(depth - 1, 0)
+    lines = []
     for key, value in data.items():
-        st.write(" " * indent + f"**{key}:**")  # Bold key for Markdown
-
+        lines.append(f"{pad}- **{key}:**" if depth else f"**{key}:**\n")
+        item_pad = "    " * depth
         if isinstance(value, dict):
-            display_json(value, indent + 4)  # Recursive call for nested dictionaries
+            lines.append(json_to_markdown(value, depth + 1))
         elif isinstance(value, list):
-            for item in value:
-                st.write(" " * (indent + 4) + f"- {item}")
+            lines.extend(f"{item_pad}- {item}" for item in value)
         else:
-            st.write(" " * (indent + 4) + f"{value}")
+            lines.append(f"{item_pad}- {value}" if depth else f"{value}")
+        if not depth:
+            lines.append("")
+    return "\n".join(lines)
 
 
-def analyze_resume_with_ai(resume_text):
-    """Analyze resume using Gemini AI to suggest career options."""
-    model = ChatGoogleGenerativeAI(model="gemini-1.5-flash", google_api_key=gemini_api_key)
+MODEL_NAME = "gemini-1.5-flash"
 
-    prompt = f"""
+ANALYSIS_PROMPT = """
     You are an AI career advisor. Analyze this resume and fill following in JSON:
     {{
-        "CareerInfo": "- Detailed resume summary
-                    - Job role he/she should apply in detail
-                    - Recommend which skills he/she should focus"
-                    - Give Ideas he/she can develop to showcase skills,
         "JobTitle": "Best job role for the user",
         "Skills": "Recommended skills to focus on",,
         "ExperienceLevel": "Based on the resume, select the most suitable experience level in list: 
@@ -38,9 +40,14 @@ def analyze_resume_with_ai(resume_text):
             3. Associate
             4. Mid-Senior level
             5. Director
-            6. Executive"
+            6. Executive",
+        "CareerInfo": "- Detailed resume summary
+                    - Job role he/she should apply in detail
+                    - Recommend which skills he/she should focus"
+                    - Give Ideas he/she can develop to showcase skills
     }}
     Important: 
+    - **Output the keys in exactly this order: JobTitle, Skills, ExperienceLevel, CareerInfo**
     - **CareerInfo should be detailed, formatted with proper sections. Start with Summary and provide information in resume**
     - **JobTitle should include real-world IT job roles suitable for this candidate. At least 5**
     - **Skills should be core IT skills used in an IT company** (avoid general skills; focus on practical, high-value skills used in industry).**
@@ -49,9 +56,134 @@ def analyze_resume_with_ai(resume_text):
     Resume: {resume_text}
     """
 
-    response = model.invoke(prompt)
+# Hash of the template: editing the prompt changes every cache key, so old answers are never reused
+ANALYSIS_PROMPT_VERSION = content_key(ANALYSIS_PROMPT)[:12]
+
+# Parsed analysis JSON, keyed by (resume text, prompt version, model)
+analysis_cache = ResultCache("gemini_analysis", ttl=7 * 24 * 3600, stale_ttl=0, max_entries=128)
+
+
+def analyze_resume_with_ai(resume_text):
+    """Analyze resume using Gemini AI to suggest career options."""
+    model = get_llm(MODEL_NAME)
+
+    prompt = ANALYSIS_PROMPT.format(resume_text=resume_text)
+
+    with tracing.span("llm.analysis", model=MODEL_NAME, prompt_chars=len(prompt)):
+        response = model.invoke(prompt)
+    tracing.record_token_usage(response, MODEL_NAME)
 
     try:
         return response
     except json.JSONDecodeError:
         return {"Error": "Failed to parse AI response"}
+
+
+def parse_ai_response(content):
+    """Strip Markdown code fences from the model output and parse it as JSON."""
+    cleaned_response = re.sub(r"```json|```", "", content.strip())
+    return json.loads(cleaned_response)
+
+
+def get_career_analysis(resume_text):
+    """
+    Return the parsed career analysis for a resume, calling Gemini only on a cache miss.
+    Returns None when the model gives an empty answer; raises json.JSONDecodeError on invalid JSON.
+    """
+    def analyze():
+        ai_response = analyze_resume_with_ai(resume_text)
+        if not ai_response or not ai_response.content.strip():
+            return None
+        return parse_ai_response(ai_response.content)
+
+    key = content_key(resume_text, ANALYSIS_PROMPT_VERSION, MODEL_NAME)
+    return analysis_cache.get_or_fetch(key, analyze)
+
+
+async def aget_career_analysis(resume_text):
+    """
+    Async get_career_analysis: same cache and result, with the Gemini call awaited instead of holding a thread.
+    Returns None when the model gives an empty answer; raises json.JSONDecodeError on invalid JSON.
+    The cache's SQLite tier is used from a worker thread, so a busy database never stalls the event loop.
+    """
+    key = content_key(resume_text, ANALYSIS_PROMPT_VERSION, MODEL_NAME)
+    cached = await asyncio.to_thread(analysis_cache.get, key)
+    tracing.incr("cache_lookups", cache=analysis_cache.namespace, result="hit" if cached is not None else "miss")
+    if cached is not None:
+        return cached
+
+    model = get_llm(MODEL_NAME)
+    prompt = ANALYSIS_PROMPT.format(resume_text=resume_text)
+    with tracing.span("llm.analysis", model=MODEL_NAME, prompt_chars=len(prompt)):
+        ai_response = await model.ainvoke(prompt)
+    tracing.record_token_usage(ai_response, MODEL_NAME)
+
+    if not ai_response or not ai_response.content.strip():
+        return None
+    parsed_response = parse_ai_response(ai_response.content)
+    await asyncio.to_thread(analysis_cache.set, key, parsed_response)
+    return parsed_response
+
+
+def stream_career_analysis(resume_text):
+    """
+    Yield ``(key, value)`` pairs of the career analysis as soon as each field is complete.
+
+    The prompt asks for the short JobTitle/Skills/ExperienceLevel fields first, so callers can start
+    job searches while the long CareerInfo section is still being generated. Cached analyses are
+    replayed immediately; a finished stream is stored in ``analysis_cache``.
+    Raises json.JSONDecodeError if the complete output is not valid JSON.
+    """
+    key = content_key(resume_text, ANALYSIS_PROMPT_VERSION, MODEL_NAME)
+    cached = analysis_cache.get(key)
+    tracing.incr("cache_lookups", cache=analysis_cache.namespace, result="hit" if cached is not None else "miss")
+    if cached is not None:
+        yield from cached.items()
+        return
+
+    model = get_llm(MODEL_NAME)
+    parser = IncrementalJSONParser()
+    prompt = ANALYSIS_PROMPT.format(resume_text=resume_text)
+    # The span counts only the time spent waiting for the model, not the caller's work between fields
+    attrs = {"model": MODEL_NAME, "prompt_chars": len(prompt), "streamed": True}
+    started = time.perf_counter()
+    model_seconds = 0.0
+    error = None
+    chunks = iter(model.stream(prompt))
+    try:
+        while True:
+            waited = time.perf_counter()
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                break
+            except Exception as e:
+                error = type(e).__name__
+                raise
+            finally:
+                model_seconds += time.perf_counter() - waited
+            if "first_chunk_ms" not in attrs:
+                attrs["first_chunk_ms"] = round(model_seconds * 1000, 1)
+            tracing.record_token_usage(chunk, MODEL_NAME)  # Gemini reports usage per chunk
+            yield from parser.feed(chunk.content)
+    finally:
+        attrs["wall_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        tracing.record_span("llm.analysis", started, model_seconds, attrs, error)
+
+    if not parser.buffer.strip():
+        return
+
+    # The incremental parser is lenient about the surrounding text; the full parse is authoritative
+    parsed_response = parse_ai_response(parser.buffer)
+    for field, value in parsed_response.items():
+        if field not in parser.fields:
+            yield field, value
+    analysis_cache.set(key, parsed_response)
+
+
+def invalidate_analysis_cache(resume_text=None):
+    """Forget the cached analysis of one resume, or of every resume."""
+    if resume_text is None:
+        analysis_cache.invalidate()
+    else:
+        analysis_cache.invalidate(content_key(resume_text, ANALYSIS_PROMPT_VERSION, MODEL_NAME))
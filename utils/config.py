@@ -0,0 +1,18 @@
+import os
+
+
+def get_gemini_api_key():
+    """
+    The Gemini API key: ``GEMINI_API_KEY`` from the environment, else from Streamlit's secrets.toml.
+    Read on first use rather than at import, so the pipeline modules also work outside Streamlit.
+    """
+    api_key = os.environ.get("GEMINI_API_KEY")
+    if api_key:
+        return api_key
+
+    import streamlit as st  # Only for the secrets file; the API and batch paths normally use the environment
+
+    try:
+        return st.secrets["GEMINI_API_KEY"]
+    except (KeyError, FileNotFoundError) as e:
+        raise RuntimeError("GEMINI_API_KEY is not set: export it or add it to .streamlit/secrets.toml") from e
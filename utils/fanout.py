@@ -0,0 +1,70 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from urllib.parse import urlsplit
+
+from utils import tracing
+
+logger = logging.getLogger(__name__)
+
+
+class FanOutScheduler:
+    """Run many blocking fetches concurrently with per-host limits and an overall deadline."""
+
+    def __init__(self, max_workers=8, per_host_limit=4, deadline=30.0):
+        """
+        :param max_workers: Size of the shared worker pool
+        :param per_host_limit: Maximum number of in-flight requests per host
+        :param deadline: Seconds after which unfinished requests are abandoned
+        """
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.deadline = deadline
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fanout")
+        self._host_slots = {}
+        self._host_lock = threading.Lock()
+        self._futures = {}
+        self._started_at = time.monotonic()
+
+    def _slot_for(self, url):
+        host = urlsplit(url).netloc
+        with self._host_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._host_slots[host]
+
+    def _run(self, url, fn, args):
+        with self._slot_for(url):
+            return fn(*args)
+
+    def submit(self, key, url, fn, *args):
+        """Schedule ``fn(*args)`` for ``url``; its result is reported under ``key``."""
+        future = self._executor.submit(tracing.bind(self._run), url, fn, args)  # Keep the caller's trace
+        self._futures[future] = key
+        return future
+
+    def results(self):
+        """Yield ``(key, result)`` pairs as requests finish, stopping at the deadline."""
+        remaining = self.deadline - (time.monotonic() - self._started_at)
+        try:
+            for future in as_completed(list(self._futures), timeout=max(remaining, 0)):
+                key = self._futures.pop(future)
+                try:
+                    yield key, future.result()
+                except Exception as e:
+                    logger.warning("Error running fan-out task %s: %s", key, e)
+                    tracing.incr("errors", stage="fanout")
+                    yield key, None
+        except FuturesTimeoutError:
+            logger.warning("Fan-out deadline of %ss reached; %d requests abandoned", self.deadline, len(self._futures))
+            tracing.incr("fanout_abandoned", len(self._futures))
+            for future, key in list(self._futures.items()):
+                future.cancel()
+                yield key, None
+            self._futures.clear()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,217 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit
+
+from utils.card_parser import canonical_job_link
+
+DEFAULT_INDEX_PATH = os.environ.get("CAREERGENIE_JOB_INDEX", os.path.join(".cache", "job_index.sqlite3"))
+INDEXED_FIELDS = ("title", "company", "location", "experience_level")
+# 2: postings keyed by canonical job link; version 1 rows hold per-search tracking hrefs and are dropped
+SCHEMA_VERSION = 2
+INDEX_TABLES = ("postings", "posting_terms", "query_results", "queries")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS postings (
+    link TEXT PRIMARY KEY,
+    title TEXT, company TEXT, location TEXT, posted TEXT,
+    experience_level TEXT,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS posting_terms (
+    field TEXT NOT NULL, term TEXT NOT NULL, link TEXT NOT NULL,
+    PRIMARY KEY (field, term, link)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS query_results (
+    query_key TEXT NOT NULL, position INTEGER NOT NULL, link TEXT NOT NULL,
+    PRIMARY KEY (query_key, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS queries (
+    query_key TEXT PRIMARY KEY, refreshed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS search_demand (
+    kind TEXT NOT NULL, term TEXT NOT NULL, requests INTEGER NOT NULL, last_requested REAL NOT NULL,
+    PRIMARY KEY (kind, term)
+);
+"""
+
+
+def tokenize(text):
+    return set(re.findall(r"[a-z0-9+#]+", str(text).casefold()))
+
+
+def experience_code(query_key):
+    """The single experience level code of a search key (e.g. "2"), or None."""
+    codes = dict(parse_qsl(urlsplit(query_key).query)).get("f_E", "")
+    codes = unquote(codes).split(",")
+    return codes[0] if len(codes) == 1 and codes[0] else None
+
+
+def single_level_keys(query_key):
+    """Split a multi-level ``f_E=1,2`` search key into one key per level; [] for other keys."""
+    parts = urlsplit(query_key)
+    params = parse_qsl(parts.query)
+    codes = [code for code in unquote(dict(params).get("f_E", "")).split(",") if code]
+    if len(codes) < 2:
+        return []
+    others = [(name, value) for name, value in params if name != "f_E"]
+    return [f"{parts.netloc}{parts.path}?{urlencode(sorted(others + [('f_E', code)]))}" for code in codes]
+
+
+class JobIndex:
+    """
+    Local store of scraped LinkedIn postings, deduplicated by canonical job link.
+
+    Postings are indexed by search (canonical search URL -> ordered links) for the app's tabs, and by
+    an inverted term index over title, company, location and experience level for ad-hoc search.
+    The refresh worker (``job_refresh_worker.py``) keeps it warm for the most requested titles and skills.
+    """
+
+    def __init__(self, db_path=DEFAULT_INDEX_PATH, max_age=24 * 3600):
+        """
+        :param db_path: SQLite file holding the index
+        :param max_age: Searches refreshed longer ago than this are treated as missing
+        """
+        self.db_path = db_path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._db = None
+
+    def _connection(self):
+        if self._db is None:
+            if os.path.dirname(self.db_path):
+                os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            # WAL lets the Streamlit app read while the refresh worker writes
+            self._db = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+            if self._db.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                with self._db:  # Searches are re-indexed on their next scrape; demand counts are kept
+                    for table in INDEX_TABLES:
+                        self._db.execute(f"DELETE FROM {table}")
+                self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        return self._db
+
+    def store(self, query_key, jobs_list):
+        """Save the parsed results of one search, replacing what was stored for it before."""
+        now = time.time()
+        level = experience_code(query_key)
+        # One row per job, however many searches and positions it shows up in
+        unique_jobs = {}
+        for job in jobs_list:
+            if job["link"] != "No Link":
+                link = canonical_job_link(job["link"])
+                unique_jobs.setdefault(link, dict(job, link=link))
+        with self._lock:
+            db = self._connection()
+            with db:
+                db.execute("DELETE FROM query_results WHERE query_key = ?", (query_key,))
+                for position, job in enumerate(unique_jobs.values()):
+                    existing = db.execute("SELECT experience_level FROM postings WHERE link = ?",
+                                          (job["link"],)).fetchone()
+                    job_level = level or (existing[0] if existing else None)
+                    db.execute(
+                        "INSERT OR REPLACE INTO postings "
+                        "(link, title, company, location, posted, experience_level, fetched_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (job["link"], job["title"], job["company"], job["location"], job["posted"], job_level, now),
+                    )
+                    db.execute("DELETE FROM posting_terms WHERE link = ?", (job["link"],))
+                    values = dict(job, experience_level=job_level or "")
+                    db.executemany(
+                        "INSERT OR IGNORE INTO posting_terms (field, term, link) VALUES (?, ?, ?)",
+                        [(field, term, job["link"]) for field in INDEXED_FIELDS for term in tokenize(values[field])],
+                    )
+                    db.execute("INSERT INTO query_results (query_key, position, link) VALUES (?, ?, ?)",
+                               (query_key, position, job["link"]))
+                db.execute("INSERT OR REPLACE INTO queries (query_key, refreshed_at) VALUES (?, ?)",
+                           (query_key, now))
+
+    def _query_jobs(self, db, query_key, max_age):
+        row = db.execute("SELECT refreshed_at FROM queries WHERE query_key = ?", (query_key,)).fetchone()
+        if row is None or (max_age is not None and time.time() - row[0] > max_age):
+            return None
+        rows = db.execute(
+            "SELECT p.title, p.company, p.location, p.posted, p.link FROM query_results q "
+            "JOIN postings p ON p.link = q.link WHERE q.query_key = ? ORDER BY q.position",
+            (query_key,),
+        ).fetchall()
+        return [dict(zip(("title", "company", "location", "posted", "link"), row)) for row in rows]
+
+    def lookup(self, query_key, limit=10, allow_stale=False, max_age=None):
+        """
+        Return the indexed job list for a search, or None if it is missing or too old.
+        Multi-level experience searches are answered from their single-level searches when all are indexed.
+        :param allow_stale: Ignore ``max_age`` (used while LinkedIn is unavailable)
+        :param max_age: Seconds after which a search counts as missing (default: the index's ``max_age``)
+        """
+        max_age = None if allow_stale else max_age or self.max_age
+        with self._lock:
+            db = self._connection()
+            jobs_list = self._query_jobs(db, query_key, max_age)
+            if jobs_list is None:
+                level_lists = [self._query_jobs(db, key, max_age) for key in single_level_keys(query_key)]
+                if not level_lists or any(level_list is None for level_list in level_lists):
+                    return None
+                # Interleave the levels so each one is represented in the first results
+                jobs_list, seen_links = [], set()
+                for rank_jobs in zip(*level_lists):
+                    for job in rank_jobs:
+                        if job["link"] not in seen_links:
+                            seen_links.add(job["link"])
+                            jobs_list.append(job)
+        return jobs_list[:limit] if limit else jobs_list
+
+    def search(self, title=None, company=None, location=None, experience_level=None, limit=50):
+        """Postings whose fields contain every given word, newest first (``experience_level`` is the f_E code)."""
+        criteria = [(field, term) for field, value in zip(INDEXED_FIELDS, (title, company, location, experience_level))
+                    if value for term in tokenize(value)]
+        with self._lock:
+            db = self._connection()
+            if criteria:
+                matches = " INTERSECT ".join(["SELECT link FROM posting_terms WHERE field = ? AND term = ?"] * len(criteria))
+                sql = (f"SELECT title, company, location, posted, link FROM postings WHERE link IN ({matches}) "
+                       "ORDER BY fetched_at DESC LIMIT ?")
+                params = [value for pair in criteria for value in pair] + [limit]
+            else:
+                sql = "SELECT title, company, location, posted, link FROM postings ORDER BY fetched_at DESC LIMIT ?"
+                params = [limit]
+            rows = db.execute(sql, params).fetchall()
+        return [dict(zip(("title", "company", "location", "posted", "link"), row)) for row in rows]
+
+    def record_request(self, kind, term):
+        """Count one user request for a job title (``kind="title"``) or skill (``kind="skill"``)."""
+        term = re.sub(r"\s+", " ", str(term)).strip()
+        if not term:
+            return
+        with self._lock:
+            db = self._connection()
+            with db:
+                db.execute(
+                    "INSERT INTO search_demand (kind, term, requests, last_requested) VALUES (?, ?, 1, ?) "
+                    "ON CONFLICT (kind, term) DO UPDATE SET requests = requests + 1, "
+                    "last_requested = excluded.last_requested",
+                    (kind, term, time.time()),
+                )
+
+    def top_requested(self, kind, limit=20):
+        """The most requested job titles or skills, most popular first."""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT term FROM search_demand WHERE kind = ? ORDER BY requests DESC, last_requested DESC LIMIT ?",
+                (kind, limit),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def clear(self):
+        """Drop every indexed posting and search (the demand counts are kept)."""
+        with self._lock:
+            db = self._connection()
+            with db:
+                for table in INDEX_TABLES:
+                    db.execute(f"DELETE FROM {table}")
+
+
+job_index = JobIndex()
@@ -1,6 +1,60 @@
-from urllib.parse import quote_plus
+import asyncio
+import logging
+import re
+import sqlite3
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, quote_plus, urlencode, urlsplit
+
+import aiohttp
 import requests
-from bs4 import BeautifulSoup
+
+from utils.cache import ResultCache
+from utils.card_parser import canonical_job_link, parse_job_cards, parse_people_cards
+from utils.fanout import FanOutScheduler
+from utils.job_index import job_index
+from utils.rate_limit import RequestGuard
+from utils.resources import HTTP_BACKOFF, HTTP_RETRIES, RETRY_STATUS_CODES, get_http_session
+from utils import tracing
+
+logger = logging.getLogger(__name__)
+
+INDIA_GEO_ID = "102713980"
+
+# One LinkedIn job search, as accepted by LinkedInScraper.fetch_jobs_batch
+JobSearchSpec = namedtuple("JobSearchSpec", ["keywords", "geo_id", "Exp_Level", "EarlyApp"],
+                           defaults=(INDIA_GEO_ID, None, False))
+
+# Every request to LinkedIn from this process goes through one shared rate limiter and circuit breaker
+linkedin_guard = RequestGuard(rate=3.0, burst=8, max_wait=10.0)
+
+# Parsed search pages, keyed by canonical search URL
+jobs_cache = ResultCache("linkedin_jobs", ttl=3600, stale_ttl=6 * 3600)
+people_cache = ResultCache("linkedin_people", ttl=6 * 3600, stale_ttl=24 * 3600)
+
+# Async page loads in progress, by cache key: concurrent analyses asking for the same search share one request
+_inflight_job_pages = {}
+
+# LinkedIn's f_E codes, in the order people search results are presented
+PEOPLE_EXPERIENCE_LEVELS = {
+    "Internship": 1,
+    "Entry level": 2,
+    "Associate": 3,
+    "Mid-Senior level": 4,
+    "Director": 5,
+    "Executive": 6
+}
+
+
+def canonical_search_key(linkedin_url):
+    """Cache key for a search URL: sorted query parameters with case- and whitespace-insensitive keywords."""
+    parts = urlsplit(linkedin_url)
+    params = []
+    for name, value in parse_qsl(parts.query, keep_blank_values=True):
+        if name == "keywords":
+            value = re.sub(r"\s+", " ", value).strip().casefold()
+        params.append((name, value))
+    return f"{parts.netloc}{parts.path}?{urlencode(sorted(params))}"
 
 
 class JobScraper:
@@ -18,9 +72,104 @@ class JobScraper:
 class LinkedInScraper(JobScraper):
     """Scraper for LinkedIn jobs."""
     BASE_URL_JOBS = "https://www.linkedin.com/jobs/search/?"
+    # Guest endpoint behind the search page's infinite scroll; returns PAGE_SIZE cards from "&start="
+    BASE_URL_JOBS_PAGES = "https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search?"
+    PAGE_SIZE = 25
     BASE_URL_PEOPLE = "https://www.linkedin.com/search/results/people/?keywords="
 
-    def fetch_jobs(self, Exp_Level=None, geo_id="102713980", EarlyApp=False):
+    @classmethod
+    def build_jobs_url(cls, job_title, Exp_Level=None, geo_id=INDIA_GEO_ID, EarlyApp=False, base_url=None):
+        """Build the LinkedIn job search URL for one search term."""
+        base_url = base_url or cls.BASE_URL_JOBS
+        job_encoded = "&keywords=" + quote_plus(job_title)
+
+        if EarlyApp:
+            linkedin_url = f"{base_url}&f_EA=true{job_encoded}"
+        else:
+            linkedin_url = f"{base_url}{job_encoded}"
+        if geo_id:
+            linkedin_url += f"&geoId={geo_id}"
+        if Exp_Level:
+            if Exp_Level.startswith("&"):
+                linkedin_url += Exp_Level  # Ready-made filter such as "&f_E=1%2C2"
+            else:
+                linkedin_url += f"&exp={quote_plus(Exp_Level)}"
+        return linkedin_url
+
+    def _fetch_job_page(self, session, linkedin_url, job_title):
+        """
+        Return the parsed job search page; None on HTTP errors.
+        Lookup order: ``jobs_cache``, then the local ``job_index``, then a live scrape.
+        """
+        query_key = canonical_search_key(linkedin_url)
+        jobs_list = jobs_cache.get_or_fetch(query_key,
+                                            lambda: self._load_job_page(session, linkedin_url, query_key))
+        if jobs_list is None:
+            jobs_list = self._stale_job_page(query_key)
+        if jobs_list is None:
+            return None
+
+        return {
+            "job_title": job_title,
+            "source": "LinkedIn",
+            "jobs": jobs_list,
+            "apply_link": linkedin_url
+        }
+
+    def _load_job_page(self, session, linkedin_url, query_key):
+        """Serve a search from the local job index, scraping it live (and indexing it) on a miss."""
+        jobs_list = self._indexed_job_page(query_key)
+        if jobs_list is not None:
+            return jobs_list
+
+        jobs_list = self._download_job_page(session, linkedin_url)
+        if jobs_list is not None:
+            self._index_job_page(query_key, linkedin_url, jobs_list)
+        return jobs_list
+
+    def _indexed_job_page(self, query_key):
+        try:
+            # No older than a fresh jobs_cache entry: when an entry goes stale, the index copy stored with it
+            # is just as old, so revalidation scrapes LinkedIn. Copies the refresh worker wrote since are served.
+            return job_index.lookup(query_key, max_age=jobs_cache.ttl)
+        except sqlite3.Error as e:
+            logger.warning("Job index unavailable: %s", e)
+            tracing.incr("errors", stage="job_index")
+            return None
+
+    def _index_job_page(self, query_key, linkedin_url, jobs_list):
+        try:
+            job_index.store(query_key, jobs_list)
+        except sqlite3.Error as e:
+            logger.warning("Could not index %s: %s", linkedin_url, e)
+            tracing.incr("errors", stage="job_index")
+
+    def _stale_job_page(self, query_key):
+        """Any earlier result for a search, however old; served while LinkedIn is failing or throttling us."""
+        jobs_list = jobs_cache.get_stale(query_key)
+        if jobs_list is None:
+            try:
+                jobs_list = job_index.lookup(query_key, allow_stale=True)
+            except sqlite3.Error:
+                jobs_list = None
+        return jobs_list
+
+    def _download_job_page(self, session, linkedin_url, limit=10):
+        """Download and parse one job search page into a list of job dicts; returns None on HTTP errors."""
+        try:
+            response = linkedin_guard.get(session, linkedin_url, headers=self.HEADERS, timeout=10)
+            response.raise_for_status()  # Handle HTTP errors
+        except requests.exceptions.RequestException as e:
+            logger.warning("Error fetching %s: %s", linkedin_url, e)
+            tracing.incr("errors", stage="linkedin_jobs", error=type(e).__name__)
+            return None
+
+        with tracing.span("parse.job_cards", url=linkedin_url) as span:
+            jobs_list = parse_job_cards(response.content, limit=limit)
+            span["cards"] = len(jobs_list)
+        return jobs_list
+
+    def fetch_jobs(self, Exp_Level=None, geo_id=INDIA_GEO_ID, EarlyApp=False):
         """
         Scrape LinkedIn job postings.
         :param EarlyApp:
@@ -28,50 +177,192 @@ class LinkedInScraper(JobScraper):
         :param geo_id: LinkedIn Geo ID (default: India)
         """
         all_jobs = []
-        session = requests.Session()
+        session = get_http_session()
 
         for job_title in self.search_terms:
-            job_encoded = "&keywords=" + quote_plus(job_title)
+            linkedin_url = self.build_jobs_url(job_title, Exp_Level, geo_id, EarlyApp)
+            result = self._fetch_job_page(session, linkedin_url, job_title)
+            if result is not None:
+                all_jobs.append(result)
 
-            if EarlyApp:
-                linkedin_url = f"{self.BASE_URL_JOBS}&f_EA=true{job_encoded}"
-            else:
-                linkedin_url = f"{self.BASE_URL_JOBS}{job_encoded}"
-            if geo_id:
-                linkedin_url += f"&geoId={geo_id}"
-            if Exp_Level:
-                linkedin_url += f"&exp={quote_plus(Exp_Level)}"
+        return all_jobs
+
+    def fetch_jobs_batch(self, specs, max_workers=8, per_host_limit=4, deadline=30.0):
+        """
+        Fetch many job searches concurrently and yield results as each one finishes.
+        :param specs: Iterable of JobSearchSpec (or (keywords, geo_id, Exp_Level, EarlyApp) tuples)
+        :param max_workers: Size of the shared worker pool
+        :param per_host_limit: Maximum concurrent requests to LinkedIn
+        :param deadline: Seconds after which unfinished searches are reported as None
+        :return: Generator of (index, result) pairs, where index is the position in ``specs``
+                 and result is a fetch_jobs-style dict or None if the search failed
+        """
+        session = get_http_session()
+        scheduler = FanOutScheduler(max_workers=max_workers, per_host_limit=per_host_limit, deadline=deadline)
+
+        for index, spec in enumerate(specs):
+            spec = JobSearchSpec(*spec)
+            linkedin_url = self.build_jobs_url(spec.keywords, spec.Exp_Level, spec.geo_id, spec.EarlyApp)
+            scheduler.submit(index, linkedin_url, self._fetch_job_page, session, linkedin_url, spec.keywords)
 
+        return scheduler.results()
+
+    async def _afetch_job_page(self, session, linkedin_url, job_title):
+        """
+        Async _fetch_job_page on an ``aiohttp.ClientSession``: the same cache, job index and stale fallback.
+        Expired cache entries are refreshed before returning rather than in the background. The cache
+        and job index are SQLite-backed, so they are read and written in worker threads.
+        """
+        query_key = canonical_search_key(linkedin_url)
+        jobs_list = await asyncio.to_thread(jobs_cache.get, query_key)
+        tracing.incr("cache_lookups", cache=jobs_cache.namespace, result="hit" if jobs_list is not None else "miss")
+        if jobs_list is None:
+            load = _inflight_job_pages.get(query_key)
+            if load is None or load.get_loop() is not asyncio.get_running_loop():
+                load = asyncio.ensure_future(self._aload_job_page(session, linkedin_url, query_key))
+                _inflight_job_pages[query_key] = load
+                load.add_done_callback(
+                    lambda done: _inflight_job_pages.pop(query_key, None) if _inflight_job_pages.get(query_key) is done
+                    else None)
+            # Shielded: one caller giving up must not cancel the load for the others
+            jobs_list = await asyncio.shield(load)
+        if jobs_list is None:
+            jobs_list = await asyncio.to_thread(self._stale_job_page, query_key)
+        if jobs_list is None:
+            return None
+
+        return {
+            "job_title": job_title,
+            "source": "LinkedIn",
+            "jobs": jobs_list,
+            "apply_link": linkedin_url
+        }
+
+    async def _aload_job_page(self, session, linkedin_url, query_key):
+        """Async _load_job_page; also stores the result in ``jobs_cache``."""
+        jobs_list = await asyncio.to_thread(self._indexed_job_page, query_key)
+        if jobs_list is None:
+            jobs_list = await self._adownload_job_page(session, linkedin_url)
+            if jobs_list is not None:
+                await asyncio.to_thread(self._index_job_page, query_key, linkedin_url, jobs_list)
+        if jobs_list is not None:
+            await asyncio.to_thread(jobs_cache.set, query_key, jobs_list)
+        return jobs_list
+
+    async def _adownload_job_page(self, session, linkedin_url, limit=10):
+        """Async _download_job_page, retrying transient server errors like the shared requests session."""
+        for attempt in range(HTTP_RETRIES + 1):
             try:
-                response = session.get(linkedin_url, headers=self.HEADERS, timeout=10)
-                response.raise_for_status()  # Handle HTTP errors
-            except requests.exceptions.RequestException as e:
-                print(f"Error fetching {linkedin_url}: {e}")
-                continue
-
-            soup = BeautifulSoup(response.text, "html.parser")
-            jobs = soup.select("div.base-card")[:10]
-
-            jobs_list = [
-                {
-                    "title": job.find("h3").get_text(strip=True) if job.find("h3") else "No Title",
-                    "company": job.find("h4").get_text(strip=True) if job.find("h4") else "Unknown Company",
-                    "location": job.select_one("span.job-search-card__location").get_text(strip=True) if job.select_one(
-                        "span.job-search-card__location") else "No Location",
-                    "posted": job.find("time").get_text(strip=True) if job.find("time") else "Unknown Time",
-                    "link": job.find("a")["href"] if job.find("a") and job.find("a").has_attr("href") else "No Link",
-                }
-                for job in jobs
-            ]
-
-            all_jobs.append({
-                "job_title": job_title,
-                "source": "LinkedIn",
-                "jobs": jobs_list,
-                "apply_link": linkedin_url
-            })
+                response, body = await linkedin_guard.aget(session, linkedin_url, headers=self.HEADERS)
+            except (requests.exceptions.RequestException, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning("Error fetching %s: %s", linkedin_url, e)
+                tracing.incr("errors", stage="linkedin_jobs", error=type(e).__name__)
+                return None
+            if response.status not in RETRY_STATUS_CODES or attempt == HTTP_RETRIES:
+                break
+            await asyncio.sleep(HTTP_BACKOFF * 2 ** attempt)
 
-        return all_jobs
+        if response.status >= 400:
+            logger.warning("Error fetching %s: HTTP %s", linkedin_url, response.status)
+            tracing.incr("errors", stage="linkedin_jobs", error="HTTPError")
+            return None
+
+        with tracing.span("parse.job_cards", url=linkedin_url) as span:
+            # Parsing takes tens of milliseconds; keep it off the event loop
+            jobs_list = await asyncio.to_thread(parse_job_cards, body, limit)
+            span["cards"] = len(jobs_list)
+        return jobs_list
+
+    async def afetch_jobs_batch(self, specs, session, per_host_limit=4, deadline=30.0):
+        """
+        Async fetch_jobs_batch: every search runs as a task on ``session`` (an ``aiohttp.ClientSession``).
+        :param specs: Iterable of JobSearchSpec (or (keywords, geo_id, Exp_Level, EarlyApp) tuples)
+        :param per_host_limit: Maximum concurrent requests to LinkedIn
+        :param deadline: Seconds after which unfinished searches are cancelled and reported as None
+        :return: List of fetch_jobs-style dicts (None for failed or unfinished searches), in ``specs`` order
+        """
+        host_slots = asyncio.Semaphore(per_host_limit)  # Every search goes to www.linkedin.com
+
+        async def fetch(spec):
+            spec = JobSearchSpec(*spec)
+            linkedin_url = self.build_jobs_url(spec.keywords, spec.Exp_Level, spec.geo_id, spec.EarlyApp)
+            try:
+                async with host_slots:
+                    return await self._afetch_job_page(session, linkedin_url, spec.keywords)
+            except Exception as e:
+                logger.warning("Error running fan-out task %s: %s", spec.keywords, e)
+                tracing.incr("errors", stage="fanout")
+                return None
+
+        tasks = []
+        try:
+            async with asyncio.timeout(deadline):
+                async with asyncio.TaskGroup() as group:
+                    tasks = [group.create_task(fetch(spec)) for spec in specs]
+        except TimeoutError:
+            abandoned = sum(1 for task in tasks if task.cancelled())
+            logger.warning("Fan-out deadline of %ss reached; %d requests abandoned", deadline, abandoned)
+            tracing.incr("fanout_abandoned", abandoned)
+        return [None if task.cancelled() else task.result() for task in tasks]
+
+    async def afetch_jobs(self, session, Exp_Level=None, geo_id=INDIA_GEO_ID, EarlyApp=False):
+        """Async fetch_jobs: all search terms are fetched concurrently on an ``aiohttp.ClientSession``."""
+        specs = [JobSearchSpec(job_title, geo_id, Exp_Level, EarlyApp) for job_title in self.search_terms]
+        return [result for result in await self.afetch_jobs_batch(specs, session) if result is not None]
+
+    def iter_jobs(self, spec, limit=100):
+        """
+        Lazily page through LinkedIn results for one search, yielding job dicts one at a time.
+        The next page is downloaded in the background while the current one is being consumed.
+        :param spec: JobSearchSpec (or (keywords, geo_id, Exp_Level, EarlyApp) tuple)
+        :param limit: Maximum number of postings to yield
+        """
+        spec = JobSearchSpec(*spec)
+        session = get_http_session()
+        base_url = self.build_jobs_url(spec.keywords, spec.Exp_Level, spec.geo_id, spec.EarlyApp,
+                                       base_url=self.BASE_URL_JOBS_PAGES)
+
+        def fetch_page(start):
+            page_url = f"{base_url}&start={start}"
+            return jobs_cache.get_or_fetch(canonical_search_key(page_url),
+                                           lambda: self._download_job_page(session, page_url, limit=None))
+
+        prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="iter-jobs")
+        try:
+            seen_links = set()
+            yielded = 0
+            start = 0
+            next_page = prefetcher.submit(tracing.bind(fetch_page), start)
+            while next_page is not None:
+                page = next_page.result()
+                if not page:
+                    break
+                start += self.PAGE_SIZE
+                has_more = len(page) >= self.PAGE_SIZE
+                if has_more and yielded + len(page) < limit:
+                    next_page = prefetcher.submit(tracing.bind(fetch_page), start)
+                else:
+                    next_page = None
+
+                page_yielded = yielded
+                for job in page:
+                    # Consecutive pages can overlap; pages cached before links were canonical still carry
+                    # per-position tracking parameters, so compare canonical links
+                    link = canonical_job_link(job["link"])
+                    if link in seen_links and link != "No Link":
+                        continue
+                    seen_links.add(link)
+                    yield job
+                    yielded += 1
+                    if yielded >= limit:
+                        return
+
+                if yielded == page_yielded:
+                    break  # Nothing new: LinkedIn is repeating its last page
+                if next_page is None and has_more:  # Duplicates left us short of the limit
+                    next_page = prefetcher.submit(tracing.bind(fetch_page), start)
+        finally:
+            prefetcher.shutdown(wait=False, cancel_futures=True)
 
     def fetch_jobs_OutsideIndia(self, Exp_Level=None):
         """Fetch LinkedIn job postings outside India."""
@@ -80,59 +371,67 @@ class LinkedInScraper(JobScraper):
     def fetch_jobs_for_Early_Applicants(self):
         return self.fetch_jobs(Exp_Level=None, geo_id=None, EarlyApp=True)
 
+    @classmethod
+    def build_people_url(cls, job_title, exp_code):
+        """Build the LinkedIn people search URL for one job title and experience level code."""
+        return f"{cls.BASE_URL_PEOPLE}{quote_plus(job_title)}&f_E={exp_code}&origin=SWITCH_SEARCH_VERTICAL"
+
+    def _fetch_people_page(self, session, job_title, exp_level):
+        """
+        Return the profiles for one (job title, experience level) search; None if none could be fetched.
+        Results are memoized in ``people_cache``; a stale copy is served while LinkedIn is failing.
+        """
+        linkedin_url = self.build_people_url(job_title, PEOPLE_EXPERIENCE_LEVELS[exp_level])
+        query_key = canonical_search_key(linkedin_url)
+        people_list = people_cache.get_or_fetch(query_key, lambda: self._download_people_page(session, linkedin_url))
+        if people_list is None:
+            people_list = people_cache.get_stale(query_key)
+        if people_list is None:
+            return None
+        return {"experience_level": exp_level, "profiles": people_list, "search_link": linkedin_url}
+
+    def iter_people(self, levels=None, max_workers=8, per_host_limit=4, deadline=30.0):
+        """
+        Search LinkedIn people for every search term and experience level concurrently.
+        :param levels: Experience level names to search (default: all of PEOPLE_EXPERIENCE_LEVELS)
+        :return: Generator of (job_title, result) pairs as each search finishes, where result is
+                 {"experience_level", "profiles", "search_link"}; failed searches are left out.
+                 Requests start immediately, before the generator is consumed.
+        """
+        session = get_http_session()
+        scheduler = FanOutScheduler(max_workers=max_workers, per_host_limit=per_host_limit, deadline=deadline)
+        for job_title in self.search_terms:
+            for exp_level in levels or PEOPLE_EXPERIENCE_LEVELS:
+                scheduler.submit(job_title, self.BASE_URL_PEOPLE, self._fetch_people_page, session, job_title,
+                                 exp_level)
+        return ((job_title, result) for job_title, result in scheduler.results() if result is not None)
+
     def fetch_people(self):
         """Scrape LinkedIn People profiles with specific experience levels."""
-        all_people = []
-        session = requests.Session()
-
-        experience_levels = {
-            "Internship": 1,
-            "Entry level": 2,
-            "Associate": 3,
-            "Mid-Senior level": 4,
-            "Director": 5,
-            "Executive": 6
-        }
+        people_by_title = {job_title: {} for job_title in self.search_terms}
+        for job_title, result in self.iter_people():
+            people_by_title[job_title][result["experience_level"]] = result
 
-        for job_title in self.search_terms:
-            job_results = {"job_title": job_title, "people": []}
-
-            for exp_level, exp_code in experience_levels.items():
-                linkedin_url = f"{self.BASE_URL_PEOPLE}{quote_plus(job_title)}&f_E={exp_code}&origin=SWITCH_SEARCH_VERTICAL"
-
-                try:
-                    response = session.get(linkedin_url, headers=self.HEADERS, timeout=10)
-                    response.raise_for_status()
-                except requests.exceptions.RequestException as e:
-                    print(f"Error fetching {linkedin_url}: {e}")
-                    continue
-
-                soup = BeautifulSoup(response.text, "html.parser")
-                people = soup.find_all("div", class_="reusable-search__entity-result")[:10]
-
-                people_list = [
-                    {
-                        "name": person.find("span", class_="entity-result__title-text").get_text(
-                            strip=True) if person.find("span", class_="entity-result__title-text") else "No Name",
-                        "position": person.find("div", class_="entity-result__primary-subtitle").get_text(
-                            strip=True) if person.find("div",
-                                                       class_="entity-result__primary-subtitle") else "No Position",
-                        "location": person.find("div", class_="entity-result__secondary-subtitle").get_text(
-                            strip=True) if person.find("div",
-                                                       class_="entity-result__secondary-subtitle") else "No Location",
-                        "profile_link": f"https://www.linkedin.com{person.find('a')['href']}" if person.find(
-                            "a") and person.find("a").has_attr("href") else "No Profile Link"
-                    }
-                    for person in people
-                ]
-
-                job_results["people"].append(
-                    {"experience_level": exp_level, "profiles": people_list, "search_link": linkedin_url}
-                )
-
-            all_people.append(job_results)
-
-        return all_people
+        return [
+            {"job_title": job_title,
+             "people": [levels[exp_level] for exp_level in PEOPLE_EXPERIENCE_LEVELS if exp_level in levels]}
+            for job_title, levels in people_by_title.items()
+        ]
+
+    def _download_people_page(self, session, linkedin_url):
+        """Download and parse one people search page into a list of profile dicts; returns None on HTTP errors."""
+        try:
+            response = linkedin_guard.get(session, linkedin_url, headers=self.HEADERS, timeout=10)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            logger.warning("Error fetching %s: %s", linkedin_url, e)
+            tracing.incr("errors", stage="linkedin_people", error=type(e).__name__)
+            return None
+
+        with tracing.span("parse.people_cards", url=linkedin_url) as span:
+            people_list = parse_people_cards(response.content)
+            span["cards"] = len(people_list)
+        return people_list
 
 
 class LinkedInSkillScraper(LinkedInScraper):
@@ -0,0 +1,153 @@
+"""
+asyncio API for the whole resume analysis, usable without Streamlit.
+
+``analyze_resume_pipeline`` extracts a resume, asks Gemini for the analysis and the improvement
+suggestions and runs the LinkedIn searches, with structured concurrency: the suggestions are
+generated while the analysis and the searches run, and when a step fails (or the caller is
+cancelled) every other step of that resume is cancelled too. Blocking work (text extraction,
+card parsing) runs in worker threads, so one event loop can serve many analyses at once.
+"""
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack
+
+from utils import tracing
+from utils.career_advisor import aget_career_analysis
+from utils.query_planner import QueryPlanner, plan_searches
+from utils.ranking import JobRanker
+from utils.resources import new_async_http_session
+from utils.resume_improver import aimprove_resume
+from utils.resume_parser import extract_resume_text
+from utils.resume_preprocessor import prepare_resume
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisError(Exception):
+    """Raised when a resume has no text or Gemini returns an empty analysis."""
+
+
+async def extract(data, file_extension, token_budget=None):
+    """
+    Extract and preprocess a resume in a worker thread.
+    :param data: File bytes (or a file-like object)
+    :param file_extension: "pdf" or "docx"; raises ValueError for anything else
+    :param token_budget: See utils.resume_preprocessor.prepare_resume
+    :return: (full text, PreparedResume)
+    """
+    def run():
+        resume_text = extract_resume_text(data, file_extension)
+        return resume_text, prepare_resume(resume_text, token_budget)
+
+    return await asyncio.to_thread(run)
+
+
+async def analyze(resume_text):
+    """The career analysis of (preprocessed) resume text; raises AnalysisError if Gemini answers with nothing."""
+    analysis = await aget_career_analysis(resume_text)
+    if not analysis:
+        raise AnalysisError("AI response is empty")
+    return analysis
+
+
+async def improve(resume_text):
+    """Resume improvement suggestions (Markdown) for (preprocessed) resume text."""
+    return await aimprove_resume(resume_text)
+
+
+async def fetch_jobs(analysis, resume_text, session, search_kinds=("job", "skill"), jobs_per_search=10,
+                     deadline=30.0):
+    """
+    Run the LinkedIn searches for an analysis, each distinct URL once, and rank the postings against the resume.
+    :param session: aiohttp.ClientSession
+    :param search_kinds: Which of the app's searches to run (see utils.query_planner.SEARCH_KINDS)
+    :param jobs_per_search: Best-matching postings kept per search
+    :param deadline: Seconds allowed for all searches together
+    :return: {kind: {search term: [job dicts, best match first]}}, each posting under one term per kind
+    """
+    planner = QueryPlanner()
+    plan_searches(planner, 0, analysis, search_kinds)
+    results = await planner.afetch(session, deadline=deadline)
+
+    found = {kind: {} for kind in search_kinds}
+    for _, kind, term in planner.targets:  # Terms in the order the analysis lists them
+        found[kind][term] = []
+    for targets, linkedin_result in results:
+        jobs_list = linkedin_result["jobs"] if linkedin_result else []
+        for _, kind, term in targets:
+            found[kind][term].extend(jobs_list)
+
+    # Like the app's tabs: a posting found for several terms of a kind is kept under the first one
+    ranker = JobRanker(resume_text, analysis.get("Skills", []))
+    jobs = {}
+    for kind, groups in found.items():
+        with tracing.span("rank_jobs", kind=kind, postings=sum(len(jobs_list) for jobs_list in groups.values())):
+            jobs[kind] = ranker.rank_groups(groups, jobs_per_search)
+    return jobs
+
+
+async def _improvement_or_error(resume_text):
+    """Suggestions are optional: a failure is reported next to the analysis instead of cancelling it."""
+    try:
+        return await improve(resume_text), None
+    except Exception as e:
+        logger.warning("Resume improvement failed: %s", e)
+        tracing.incr("errors", stage="improvement", error=type(e).__name__)
+        return None, str(e)
+
+
+async def analyze_resume_pipeline(data=None, file_extension=None, resume_text=None, session=None,
+                                  search_kinds=("job", "skill"), jobs_per_search=10, with_improvement=True,
+                                  token_budget=None, deadline=30.0):
+    """
+    Analyze one resume end to end. Pass either the file (``data`` and ``file_extension``) or its ``resume_text``.
+    :param session: aiohttp.ClientSession for LinkedIn, shared between calls (a temporary one if None)
+    :param search_kinds: Job searches to run; empty for none
+    :param jobs_per_search: Best-matching postings kept per search
+    :param with_improvement: Also generate resume improvement suggestions
+    :param token_budget: Resume tokens sent to Gemini (see utils.resume_preprocessor)
+    :param deadline: Seconds allowed for the LinkedIn searches
+    :return: {"run_id", "analysis", "improvement", "improvement_error", "jobs", "prompt_tokens",
+              "tokens_saved", "elapsed_ms", "stages"}
+    Raises ValueError for unsupported files, AnalysisError for empty resumes or answers and
+    json.JSONDecodeError when Gemini's answer is not valid JSON.
+    """
+    async with AsyncExitStack() as stack:
+        if session is None and search_kinds:
+            session = await stack.enter_async_context(new_async_http_session())
+
+        started = time.perf_counter()
+        with tracing.trace_run("pipeline") as trace:
+            if resume_text is None:
+                resume_text, prepared = await extract(data, file_extension, token_budget)
+            else:
+                prepared = await asyncio.to_thread(prepare_resume, resume_text, token_budget)
+            if not prepared.text:
+                raise AnalysisError("No text found in the resume")
+
+            improvement_task = None
+            jobs = {}
+            try:
+                async with asyncio.TaskGroup() as group:
+                    if with_improvement:
+                        improvement_task = group.create_task(_improvement_or_error(prepared.text))
+                    analysis = await analyze(prepared.text)
+                    if search_kinds:
+                        jobs = await fetch_jobs(analysis, resume_text, session, search_kinds, jobs_per_search,
+                                                deadline)
+            except ExceptionGroup as errors:
+                raise errors.exceptions[0]  # Callers see the failing step's own exception
+
+    improvement, improvement_error = improvement_task.result() if improvement_task else (None, None)
+    return {
+        "run_id": trace.run_id,
+        "analysis": analysis,
+        "improvement": improvement,
+        "improvement_error": improvement_error,
+        "jobs": jobs,
+        "prompt_tokens": prepared.tokens,
+        "tokens_saved": prepared.original_tokens - prepared.tokens,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        "stages": trace.breakdown(),
+    }
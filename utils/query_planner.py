@@ -0,0 +1,141 @@
+import re
+from urllib.parse import unquote
+
+from utils.job_scraper import PEOPLE_EXPERIENCE_LEVELS, JobSearchSpec, LinkedInScraper
+
+EXP_FILTER = "&f_E="
+# The job searches of app.py's tabs, as selectable for batch and API runs
+SEARCH_KINDS = ("job", "skill", "outside_india", "experience", "early_applicant")
+
+
+def experience_filter(exp_codes):
+    """Build a LinkedIn experience filter covering several levels, e.g. ``&f_E=1%2C2%2C3``."""
+    return f"{EXP_FILTER}{'%2C'.join(map(str, sorted(set(exp_codes))))}"
+
+
+def experience_codes(Exp_Level):
+    """Return the level codes of an ``&f_E=...`` filter, or None for any other Exp_Level value."""
+    if not Exp_Level or not Exp_Level.startswith(EXP_FILTER):
+        return None
+    return tuple(sorted({int(code) for code in unquote(Exp_Level[len(EXP_FILTER):]).split(",") if code}))
+
+
+def normalize_spec(spec):
+    """Canonical form of a search spec: trimmed keywords, sorted experience codes."""
+    spec = JobSearchSpec(*spec)
+    keywords = re.sub(r"\s+", " ", str(spec.keywords)).strip()
+    exp_codes = experience_codes(spec.Exp_Level)
+    Exp_Level = experience_filter(exp_codes) if exp_codes else (spec.Exp_Level or None)
+    return spec._replace(keywords=keywords, geo_id=spec.geo_id or None, Exp_Level=Exp_Level,
+                         EarlyApp=bool(spec.EarlyApp))
+
+
+def canonical_url(spec):
+    """Cache/deduplication key for a spec: its search URL with case-insensitive keywords."""
+    spec = normalize_spec(spec)
+    return LinkedInScraper.build_jobs_url(spec.keywords.casefold(), spec.Exp_Level, spec.geo_id, spec.EarlyApp)
+
+
+class QueryPlanner:
+    """
+    Collects the LinkedIn searches every tab needs, fetches each distinct URL once
+    and hands each result back to all the targets that asked for it.
+
+    Specs added under the same target that differ only by a single experience level
+    are merged into one multi-level request (``&f_E=1%2C2%2C3``).
+    """
+
+    def __init__(self):
+        self._targets = {}  # target -> list of normalized specs, in insertion order
+
+    def add(self, target, spec):
+        """Register ``spec`` as needed by ``target`` (any hashable, e.g. an expander index)."""
+        self._targets.setdefault(target, []).append(normalize_spec(spec))
+
+    def _merge(self, specs):
+        merged = []
+        group_positions = {}  # base spec -> position of its merged request in ``merged``
+        for spec in specs:
+            exp_codes = experience_codes(spec.Exp_Level)
+            if exp_codes is None:
+                merged.append(spec)
+                continue
+            base = spec._replace(Exp_Level=None)
+            if base not in group_positions:
+                group_positions[base] = len(merged)
+                merged.append(spec)
+            else:
+                position = group_positions[base]
+                combined = experience_codes(merged[position].Exp_Level) + exp_codes
+                merged[position] = base._replace(Exp_Level=experience_filter(combined))
+        return merged
+
+    def plan(self):
+        """Return ``{canonical_url: (spec, [targets])}`` with one entry per distinct request."""
+        requests_by_url = {}
+        for target, specs in self._targets.items():
+            for spec in self._merge(specs):
+                key = canonical_url(spec)
+                if key not in requests_by_url:
+                    requests_by_url[key] = (spec, [])
+                requests_by_url[key][1].append(target)
+        return requests_by_url
+
+    @property
+    def targets(self):
+        """Every registered target, in the order it was first added."""
+        return list(self._targets)
+
+    @property
+    def stats(self):
+        """How many searches were requested, how many HTTP calls are made and how many were saved."""
+        requested = sum(len(specs) for specs in self._targets.values())
+        fetched = len(self.plan())
+        return {"requested": requested, "fetched": fetched, "saved": requested - fetched}
+
+    def fetch(self, scraper=None, **batch_kwargs):
+        """
+        Fetch every distinct request concurrently.
+        :param scraper: LinkedInScraper used for the batch (default: a new one)
+        :param batch_kwargs: Passed through to LinkedInScraper.fetch_jobs_batch
+        :return: Generator of (targets, result) pairs as each request finishes.
+                 Requests start immediately, before the generator is consumed.
+        """
+        scraper = scraper or LinkedInScraper([])
+        planned = list(self.plan().values())
+        results = scraper.fetch_jobs_batch([spec for spec, _ in planned], **batch_kwargs)
+        return ((planned[index][1], result) for index, result in results)
+
+    async def afetch(self, session, scraper=None, **batch_kwargs):
+        """
+        Async ``fetch`` on an ``aiohttp.ClientSession``.
+        :param batch_kwargs: Passed through to LinkedInScraper.afetch_jobs_batch
+        :return: List of (targets, result) pairs, once every request has finished or hit the deadline
+        """
+        scraper = scraper or LinkedInScraper([])
+        planned = list(self.plan().values())
+        results = await scraper.afetch_jobs_batch([spec for spec, _ in planned], session, **batch_kwargs)
+        return [(targets, result) for (_, targets), result in zip(planned, results)]
+
+
+def plan_searches(planner, resume_index, analysis, kinds):
+    """Register the searches of one resume under ``(resume_index, kind, term)`` targets (as app.py's tabs do)."""
+    jobs, skills = analysis.get("JobTitle", []), analysis.get("Skills", [])
+    jobs = [jobs] if isinstance(jobs, str) else jobs
+    skills = [skills] if isinstance(skills, str) else skills
+    # The people search's f_E codes are the ones job searches use too
+    levels = [PEOPLE_EXPERIENCE_LEVELS[level] for level in analysis.get("ExperienceLevel", [])
+              if level in PEOPLE_EXPERIENCE_LEVELS]
+    for job in jobs:
+        if "job" in kinds:
+            planner.add((resume_index, "job", job), JobSearchSpec(job))
+        if "outside_india" in kinds:
+            planner.add((resume_index, "outside_india", job), JobSearchSpec(job, geo_id=None))
+        if "early_applicant" in kinds:
+            planner.add((resume_index, "early_applicant", job), JobSearchSpec(job, geo_id=None, EarlyApp=True))
+        if "experience" in kinds:
+            for level in levels:
+                planner.add((resume_index, "experience", job), JobSearchSpec(job, Exp_Level=f"&f_E={level}"))
+    if "skill" in kinds:
+        for skill in skills:
+            planner.add((resume_index, "skill", skill), JobSearchSpec(skill))
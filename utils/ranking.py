@@ -0,0 +1,160 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from utils.card_parser import canonical_job_link
+
+N_FEATURES = 2 ** 18
+SKILL_WEIGHT = 3.0  # AI-recommended skills count more than incidental resume words
+STOP_WORDS = frozenset(
+    "a an and as at by for from in of on or the to with i my me we our you your is are was were be been "
+    "this that it its using used use work worked working experience team teams role".split()
+)
+
+
+def _tokens(text):
+    return [token for token in re.findall(r"[a-z0-9+#.]+", str(text).casefold().replace("-", " "))
+            if token not in STOP_WORDS and token.strip(".")]
+
+
+def _hashed_features(text):
+    """Hashed word unigrams, word bigrams and character trigrams of ``text`` (trigrams catch scientist/science)."""
+    tokens = _tokens(text)
+    grams = tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+    grams += [f"#{token[i:i + 3]}" for token in tokens if len(token) > 3 for i in range(len(token) - 2)]
+    # Python's string hash is salted per process, which is fine: vectors are never persisted or shared
+    return [hash(gram) & (N_FEATURES - 1) for gram in grams]
+
+
+@lru_cache(maxsize=16384)
+def _field_features(text):
+    # Titles, companies and locations repeat a lot across postings, so their features are memoized
+    return tuple(_hashed_features(text))
+
+
+def _profile_vector(resume_text, skills):
+    profile = np.zeros(N_FEATURES, dtype=np.float32)
+    np.add.at(profile, _hashed_features(resume_text), 1.0)
+    for skill in skills:
+        np.add.at(profile, _hashed_features(skill), SKILL_WEIGHT)
+    profile = np.log1p(profile)  # Sublinear term frequency
+    norm = np.linalg.norm(profile)
+    return profile / norm if norm else profile
+
+
+class JobRanker:
+    """
+    Scores job postings against a resume with hashed n-gram vectors and cosine similarity.
+
+    A posting's vector is its title (counted twice), company and location vectors added together.
+    Titles, companies and locations repeat heavily across postings, so each distinct field text is
+    vectorized once and reduced to two numbers (its dot product with the resume and its squared norm)
+    in a single sparse NumPy pass; scoring a posting is then a few array lookups. Fields are assumed
+    to share few n-grams, so the squared norms are simply added.
+    """
+
+    TITLE_WEIGHT = 2.0  # The title carries most of the signal
+
+    def __init__(self, resume_text, skills=()):
+        self.profile = _profile_vector(resume_text, skills)
+        self._field_ids = {}  # field text -> position in the arrays below
+        self._field_dots = np.zeros(0)  # dot product of each field vector with the profile
+        self._field_squared_norms = np.zeros(0)
+
+    def _add_fields(self, texts):
+        rows, features = [], []
+        for row, text in enumerate(texts):
+            text_features = _field_features(text)
+            rows.extend([row] * len(text_features))
+            features.extend(text_features)
+        rows = np.asarray(rows, dtype=np.int64)
+        features = np.asarray(features, dtype=np.int64)
+
+        # Collapse repeated (row, feature) pairs into counts, then apply sublinear tf
+        pairs, counts = np.unique(rows * N_FEATURES + features, return_counts=True)
+        pair_rows, pair_features = np.divmod(pairs, N_FEATURES)
+        weights = np.log1p(counts.astype(np.float32))
+
+        dots = np.bincount(pair_rows, weights=weights * self.profile[pair_features], minlength=len(texts))
+        squared_norms = np.bincount(pair_rows, weights=weights ** 2, minlength=len(texts))
+
+        offset = len(self._field_ids)
+        self._field_ids.update((text, offset + row) for row, text in enumerate(texts))
+        self._field_dots = np.concatenate([self._field_dots, dots])
+        self._field_squared_norms = np.concatenate([self._field_squared_norms, squared_norms])
+
+    def score(self, jobs):
+        """Cosine similarity of each posting (title, company, location) to the resume, as a NumPy array."""
+        columns = [[job[field] for job in jobs] for field in ("title", "company", "location")]
+        new_texts = set().union(*columns) - self._field_ids.keys()
+        if new_texts:
+            self._add_fields(list(new_texts))
+
+        ids = np.array([[self._field_ids[text] for text in column] for column in columns], dtype=np.int64)
+        field_weights = np.array([[self.TITLE_WEIGHT], [1.0], [1.0]])
+        dots = (self._field_dots[ids] * field_weights).sum(axis=0)
+        norms = np.sqrt((self._field_squared_norms[ids] * field_weights ** 2).sum(axis=0))
+        return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+
+    def rank(self, jobs, top_k=None, exclude=()):
+        """
+        Deduplicate ``jobs`` (see ``posting_key``) and return them best match first (the ``top_k`` best, if given).
+        :param exclude: Posting keys to leave out
+        """
+        return self._rank_unique(unique_postings(jobs, set(exclude)), top_k)
+
+    def _rank_unique(self, jobs, top_k):
+        if not jobs:
+            return []
+        order = np.argsort(-self.score(jobs), kind="stable")
+        return [jobs[index] for index in order[:top_k]]
+
+    def rank_groups(self, groups, top_k=10, exclude=()):
+        """
+        Rank several groups of postings (e.g. the sections of a tab) with a single scoring pass.
+        A posting found by several groups is kept only in the first group that has it.
+        :param groups: Mapping of group name -> list of job dicts, in display order
+        :param exclude: Posting keys (see ``posting_key``) to leave out, e.g. postings shown in other tabs
+        :return: Mapping of group name -> top_k job dicts, best match first
+        """
+        seen = set(exclude)
+        unique_groups = {name: unique_postings(jobs, seen) for name, jobs in groups.items()}
+        all_jobs = [job for jobs in unique_groups.values() for job in jobs]
+        scores = self.score(all_jobs) if all_jobs else np.zeros(0)
+
+        ranked = {}
+        offset = 0
+        for name, jobs in unique_groups.items():
+            order = np.argsort(-scores[offset:offset + len(jobs)], kind="stable")
+            ranked[name] = [jobs[index] for index in order[:top_k]]
+            offset += len(jobs)
+        return ranked
+
+
+def posting_key(job):
+    """
+    Identity of a posting for deduplication: its canonical job link, or None for postings without a
+    link, which are never merged (the card parser gives every link-less card the same "No Link").
+    Links cached before the card parser canonicalized them are canonicalized here.
+    """
+    if not job.get("link") or job["link"] == "No Link":
+        return None
+    return canonical_job_link(job["link"])
+
+
+def unique_postings(jobs, seen=None):
+    """
+    ``jobs`` without repeated postings, first occurrence kept, in their original order.
+    :param seen: Optional set of posting keys to skip and to add to, shared across calls
+    """
+    seen = set() if seen is None else seen
+    unique_jobs = []
+    for job in jobs:
+        key = posting_key(job)
+        if key is not None:
+            if key in seen:
+                continue
+            seen.add(key)
+        unique_jobs.append(job)
+    return unique_jobs
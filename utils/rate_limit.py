@@ -0,0 +1,291 @@
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+
+from utils import tracing
+
+THROTTLE_STATUS_CODES = (429, 999)  # LinkedIn answers 999 when it suspects scraping
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of sending a request while the circuit breaker is open."""
+
+
+class ThrottledError(requests.exceptions.RequestException):
+    """Raised when the server throttled a request, or no rate-limit token became available in time."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket whose refill rate can be lowered and restored at runtime."""
+
+    def __init__(self, rate, capacity):
+        """
+        :param rate: Tokens added per second
+        :param capacity: Maximum burst size
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _take(self):
+        """Take a token if one is available (returns 0); otherwise return the seconds until the next one."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, timeout=None):
+        """Take one token, waiting up to ``timeout`` seconds (forever if None). Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._take()
+            if not wait:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    async def acquire_async(self, timeout=None):
+        """``acquire`` for coroutines: waits without blocking the event loop."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._take()
+            if not wait:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            await asyncio.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Opens after ``failure_threshold`` consecutive failures and rejects calls for ``reset_timeout`` seconds.
+    After that a single trial call is let through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                return True  # The trial call
+            return self.state == "closed"
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self.state = "closed"
+
+    def release_trial(self):
+        """Hand back a half-open trial that ended before its outcome was known, so the next call takes it."""
+        with self._lock:
+            if self.state == "half_open":
+                self.state = "open"  # _opened_at is unchanged, so the next allow() is the new trial
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+def retry_after_seconds(response):
+    """Parse a ``Retry-After`` header given in seconds or as an HTTP date; None if absent or invalid."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class RequestGuard:
+    """
+    Shared throttle for all requests to one site, across threads and Streamlit sessions.
+
+    Combines a token bucket, adaptive backoff (throttled responses halve the request rate and pause
+    all traffic for ``Retry-After`` or an exponential delay; successes restore the rate gradually)
+    and a circuit breaker that fails fast while the site keeps refusing us.
+    """
+
+    def __init__(self, rate=2.0, burst=5, max_wait=10.0, min_rate=0.2, base_backoff=2.0, max_backoff=120.0,
+                 failure_threshold=5, reset_timeout=60.0):
+        """
+        :param rate: Normal requests per second
+        :param burst: Requests that may be sent back to back
+        :param max_wait: Longest a caller waits for a token before giving up
+        :param min_rate: Floor for the adaptive request rate
+        :param base_backoff: First pause after a throttled response when no Retry-After is sent
+        :param max_backoff: Upper bound for any pause
+        """
+        self.max_rate = rate
+        self.min_rate = min_rate
+        self.max_wait = max_wait
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self._consecutive_throttles = 0
+        self.counters = {"requests": 0, "succeeded": 0, "throttled": 0, "failed": 0, "short_circuited": 0,
+                         "gave_up_waiting": 0, "wait_seconds": 0.0}
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+        if name != "wait_seconds":
+            tracing.incr("guard_events", event=name)
+
+    def _pause_before_request(self, started):
+        """Seconds to pause for an earlier throttle; raises ThrottledError if that is longer than ``max_wait``."""
+        pause = self._paused_until - started
+        if pause > self.max_wait:
+            self._count("gave_up_waiting")
+            raise ThrottledError(f"Backing off for another {pause:.0f}s")
+        return max(pause, 0)
+
+    def _wait_for_slot(self):
+        started = time.monotonic()
+        time.sleep(self._pause_before_request(started))
+        if not self.bucket.acquire(timeout=max(self.max_wait - (time.monotonic() - started), 0)):
+            self._count("gave_up_waiting")
+            raise ThrottledError("No rate-limit token available")
+        self._count("wait_seconds", time.monotonic() - started)
+
+    async def _wait_for_slot_async(self):
+        started = time.monotonic()
+        await asyncio.sleep(self._pause_before_request(started))
+        if not await self.bucket.acquire_async(timeout=max(self.max_wait - (time.monotonic() - started), 0)):
+            self._count("gave_up_waiting")
+            raise ThrottledError("No rate-limit token available")
+        self._count("wait_seconds", time.monotonic() - started)
+
+    def _throttled(self, response):
+        with self._lock:
+            self._consecutive_throttles += 1
+            delay = retry_after_seconds(response)
+            if delay is None:
+                delay = self.base_backoff * 2 ** (self._consecutive_throttles - 1)
+            self._paused_until = max(self._paused_until, time.monotonic() + min(delay, self.max_backoff))
+            self.bucket.rate = max(self.bucket.rate / 2, self.min_rate)  # Multiplicative decrease
+            self.counters["throttled"] += 1
+
+    def _succeeded(self):
+        with self._lock:
+            self._consecutive_throttles = 0
+            self.bucket.rate = min(self.bucket.rate + 0.1 * self.max_rate, self.max_rate)  # Additive increase
+            self.counters["succeeded"] += 1
+
+    def get(self, session, url, **kwargs):
+        """
+        ``session.get(url, **kwargs)`` under the guard.
+        Raises CircuitOpenError or ThrottledError (both RequestExceptions) instead of hammering the site.
+        """
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            raise CircuitOpenError(f"Circuit open, not requesting {url}")
+        try:
+            with tracing.span("http.wait", host=urlsplit(url).netloc):
+                self._wait_for_slot()
+            self._count("requests")
+
+            with tracing.span("http.get", url=url) as span:
+                try:
+                    response = session.get(url, **kwargs)
+                except requests.exceptions.RequestException:
+                    self._count("failed")
+                    self.breaker.record_failure()
+                    raise
+                span["status"] = response.status_code
+                span["bytes"] = len(response.content)
+            self._record_response(url, response.status_code, span["bytes"], response)
+        except BaseException:
+            self.breaker.release_trial()  # No-op unless this was a half-open trial with no recorded outcome
+            raise
+        return response
+
+    async def aget(self, session, url, **kwargs):
+        """
+        ``session.get(url, **kwargs)`` on an ``aiohttp.ClientSession``, under the same limits as ``get``.
+        Returns ``(response, body)`` with the body already read. Raises CircuitOpenError or ThrottledError
+        like ``get``; connection errors and timeouts propagate as aiohttp.ClientError / asyncio.TimeoutError.
+        """
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            raise CircuitOpenError(f"Circuit open, not requesting {url}")
+        try:
+            with tracing.span("http.wait", host=urlsplit(url).netloc):
+                await self._wait_for_slot_async()
+            self._count("requests")
+
+            with tracing.span("http.get", url=url) as span:
+                try:
+                    async with session.get(url, **kwargs) as response:
+                        body = await response.read()
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    self._count("failed")
+                    self.breaker.record_failure()
+                    raise
+                span["status"] = response.status
+                span["bytes"] = len(body)
+            self._record_response(url, response.status, span["bytes"], response)
+        except BaseException:  # Including cancellation while waiting or reading
+            self.breaker.release_trial()
+            raise
+        return response, body
+
+    def _record_response(self, url, status, size, response):
+        """Feed a response into the counters, adaptive rate and circuit breaker; raises on throttling."""
+        tracing.incr("http_responses", status=status)
+        tracing.incr("http_bytes", size)
+
+        if status in THROTTLE_STATUS_CODES:
+            self._throttled(response)
+            self.breaker.record_failure()
+            raise ThrottledError(f"HTTP {status} for {url}", response=response)
+        if status >= 500:
+            self._count("failed")
+            self.breaker.record_failure()
+        else:
+            self._succeeded()
+            self.breaker.record_success()
+
+    @property
+    def metrics(self):
+        """Counters plus the current adaptive rate, pause and breaker state."""
+        with self._lock:
+            return dict(
+                self.counters,
+                wait_seconds=round(self.counters["wait_seconds"], 2),
+                current_rate=round(self.bucket.rate, 3),
+                paused_for=round(max(self._paused_until - time.monotonic(), 0.0), 1),
+                circuit=self.breaker.state,
+            )
@@ -0,0 +1,59 @@
+from functools import lru_cache
+
+import aiohttp
+import requests
+from langchain_google_genai import ChatGoogleGenerativeAI
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.config import get_gemini_api_key
+
+# Sized for the fan-out in utils/fanout.py: several concurrent sessions x per-host limit
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 32
+# Transient server errors are retried with exponential backoff (0.5 s, 1 s)
+HTTP_RETRIES = 2
+HTTP_BACKOFF = 0.5
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+HTTP_TIMEOUT = 10
+
+
+@lru_cache(maxsize=None)
+def get_http_session():
+    """
+    Process-wide ``requests.Session`` shared by every scraper and Streamlit session.
+    Keeps TLS connections alive across requests and retries transient server errors with backoff.
+    """
+    retry = Retry(
+        total=HTTP_RETRIES,
+        connect=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=("GET",),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def new_async_http_session():
+    """
+    A new ``aiohttp.ClientSession`` for the async pipeline, with the same pool size and timeout as
+    ``get_http_session``. aiohttp sessions belong to one event loop, so callers create and close their own.
+    """
+    connector = aiohttp.TCPConnector(limit=POOL_MAXSIZE, ttl_dns_cache=300)
+    return aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT))
+
+
+def get_llm(model_name, api_key=None):
+    """One shared Gemini chat client per (model, API key); the key is looked up on first use if not given."""
+    return _gemini_client(model_name, api_key or get_gemini_api_key())
+
+
+@lru_cache(maxsize=None)
+def _gemini_client(model_name, api_key):
+    return ChatGoogleGenerativeAI(model=model_name, google_api_key=api_key)
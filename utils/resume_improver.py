@@ -1,14 +1,12 @@
-import streamlit as st
-from langchain_google_genai import ChatGoogleGenerativeAI
+import asyncio
 
-gemini_api_key = st.secrets["GEMINI_API_KEY"]
+from utils.cache import ResultCache, content_key
+from utils.resources import get_llm
+from utils import tracing
 
+MODEL_NAME = "gemini-1.5-flash"
 
-def improve_resume(resume_text):
-    """Use AI to enhance resume content and suggest improvements."""
-    model = ChatGoogleGenerativeAI(model="gemini-1.5-flash", google_api_key=gemini_api_key)
-
-    prompt = f"""
+IMPROVEMENT_PROMPT = """
     You are an AI Resume Improvement Expert. Analyze the resume below and suggest:
     - Better formatting for ATS (Applicant Tracking System)
     - Grammar improvements
@@ -17,5 +15,53 @@ def improve_resume(resume_text):
 
     Resume: {resume_text}
     """
-    response = model.invoke(prompt)
+
+# Hash of the template: editing the prompt changes every cache key, so old answers are never reused
+IMPROVEMENT_PROMPT_VERSION = content_key(IMPROVEMENT_PROMPT)[:12]
+
+# Improvement suggestions (Markdown), keyed by (resume text, prompt version, model)
+improvement_cache = ResultCache("gemini_improvement", ttl=7 * 24 * 3600, stale_ttl=0, max_entries=128)
+
+
+def improve_resume(resume_text):
+    """Use AI to enhance resume content and suggest improvements."""
+    def improve():
+        model = get_llm(MODEL_NAME)
+
+        prompt = IMPROVEMENT_PROMPT.format(resume_text=resume_text)
+        with tracing.span("llm.improvement", model=MODEL_NAME, prompt_chars=len(prompt)):
+            response = model.invoke(prompt)
+        tracing.record_token_usage(response, MODEL_NAME)
+        return response.content
+
+    key = content_key(resume_text, IMPROVEMENT_PROMPT_VERSION, MODEL_NAME)
+    return improvement_cache.get_or_fetch(key, improve)
+
+
+async def aimprove_resume(resume_text):
+    """
+    Async improve_resume: same cache and result, with the Gemini call awaited instead of holding a thread.
+    The cache's SQLite tier is used from a worker thread.
+    """
+    key = content_key(resume_text, IMPROVEMENT_PROMPT_VERSION, MODEL_NAME)
+    cached = await asyncio.to_thread(improvement_cache.get, key)
+    tracing.incr("cache_lookups", cache=improvement_cache.namespace, result="hit" if cached is not None else "miss")
+    if cached is not None:
+        return cached
+
+    model = get_llm(MODEL_NAME)
+    prompt = IMPROVEMENT_PROMPT.format(resume_text=resume_text)
+    with tracing.span("llm.improvement", model=MODEL_NAME, prompt_chars=len(prompt)):
+        response = await model.ainvoke(prompt)
+    tracing.record_token_usage(response, MODEL_NAME)
+    if response.content:
+        await asyncio.to_thread(improvement_cache.set, key, response.content)
     return response.content
+
+
+def invalidate_improvement_cache(resume_text=None):
+    """Forget the cached suggestions for one resume, or for every resume."""
+    if resume_text is None:
+        improvement_cache.invalidate()
+    else:
+        improvement_cache.invalidate(content_key(resume_text, IMPROVEMENT_PROMPT_VERSION, MODEL_NAME))
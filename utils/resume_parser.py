@@ -1,23 +1,175 @@
+import hashlib
+import logging
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
 import fitz  # PyMuPDF
 import docx
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+
+from utils import tracing
+
+# Longer uploads are cut off. Set above PARALLEL_PAGE_THRESHOLD so long portfolios and publication lists
+# can still use page-parallel extraction
+DEFAULT_MAX_PAGES = 100
+DEFAULT_MAX_CHARS = 100_000  # Keeps memory and prompt size bounded
+# Plain text pages take ~3 ms each, so handing pages to worker processes only pays off for long documents
+PARALLEL_PAGE_THRESHOLD = 48
+PDF_WORKERS = 4
+CACHE_SIZE = 32
+# Separates PDF pages in the extracted text (str.splitlines treats it as a line break), so the
+# preprocessor can tell running headers and footers from lines that genuinely repeat
+PAGE_BREAK = "\f"
+
+_text_cache = OrderedDict()  # (sha256, extension, max_pages, max_chars) -> text
+_cache_lock = threading.Lock()
+_pdf_pool = None
+
+logger = logging.getLogger(__name__)
+
+
+def _file_bytes(file_obj):
+    if isinstance(file_obj, (bytes, bytearray)):
+        return bytes(file_obj)
+    if hasattr(file_obj, "getvalue"):
+        return file_obj.getvalue()
+    return file_obj.read()
+
+
+def _get_pdf_pool():
+    # PyMuPDF is not thread-safe, so long PDFs are split across processes; "spawn" avoids
+    # forking the multi-threaded Streamlit server.
+    global _pdf_pool
+    if _pdf_pool is None:
+        _pdf_pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pdf_pool
+
+
+def _reset_pdf_pool():
+    global _pdf_pool
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(wait=False, cancel_futures=True)
+        _pdf_pool = None
+
+
+def _pdf_page_range_text(data, start, stop):
+    """Extract pages ``start``..``stop - 1`` of a PDF; runs in a worker process."""
+    with fitz.open(stream=data, filetype="pdf") as pdf_document:
+        return [pdf_document[number].get_text("text") for number in range(start, stop)]
+
 
+def _extract_pdf(data, max_pages, max_chars):
+    with fitz.open(stream=data, filetype="pdf") as pdf_document:  # Read PDF from bytes
+        page_count = min(pdf_document.page_count, max_pages or pdf_document.page_count)
 
-def extract_resume_text(file_obj, file_extension):
-    """Extracts text from a resume file (PDF/DOCX) using fitz and python-docx."""
+        if page_count < PARALLEL_PAGE_THRESHOLD:
+            pages = []
+            total_chars = 0
+            for number in range(page_count):
+                page_text = pdf_document[number].get_text("text")
+                pages.append(page_text)
+                total_chars += len(page_text) + 1
+                if max_chars and total_chars >= max_chars:
+                    break  # Character budget spent; skip the remaining pages
+            return PAGE_BREAK.join(pages)
 
-    if file_extension == "pdf":
-        text = ""
-        pdf_document = fitz.open(stream=file_obj, filetype="pdf")  # Read PDF from BytesIO
-        for page in pdf_document:
-            text += page.get_text("text") + "\n"
-        return text.strip()
+    chunk_size = -(-page_count // PDF_WORKERS)
+    ranges = [(start, min(start + chunk_size, page_count)) for start in range(0, page_count, chunk_size)]
+    try:
+        chunks = list(_get_pdf_pool().map(_pdf_page_range_text, [data] * len(ranges), *zip(*ranges)))
+    except (BrokenProcessPool, OSError) as e:
+        logger.warning("Page-parallel PDF extraction failed, reading pages sequentially: %s", e)
+        _reset_pdf_pool()
+        chunks = [_pdf_page_range_text(data, 0, page_count)]
+    return PAGE_BREAK.join(page_text for chunk in chunks for page_text in chunk)
 
-    elif file_extension == "docx":
-        text = []
-        doc = docx.Document(file_obj)  # Read DOCX from BytesIO
-        for paragraph in doc.paragraphs:
-            text.append(paragraph.text)
-        return "\n".join(text).strip()
 
-    else:
+def _docx_block_text(block):
+    if isinstance(block, Table):
+        rows = []
+        for row in block.rows:
+            cells = []
+            for cell in row.cells:
+                cell_text = cell.text.strip()
+                if cell_text and cell_text not in cells:  # Merged cells repeat their text
+                    cells.append(cell_text)
+            if cells:
+                rows.append(" | ".join(cells))
+        return "\n".join(rows)
+    return block.text
+
+
+def _extract_docx(file_obj):
+    doc = docx.Document(file_obj)  # Read DOCX from BytesIO
+
+    # Body paragraphs and tables, in document order
+    body = []
+    for element in doc.element.body.iterchildren():
+        if element.tag.endswith("}p"):
+            body.append(_docx_block_text(Paragraph(element, doc)))
+        elif element.tag.endswith("}tbl"):
+            body.append(_docx_block_text(Table(element, doc)))
+
+    # Headers and footers often hold the candidate's name and contact details
+    header, footer = [], []
+    for section in doc.sections:
+        for part, target in ((section.header, header), (section.footer, footer)):
+            if part.is_linked_to_previous:
+                continue
+            for paragraph in part.paragraphs:
+                if paragraph.text.strip() and paragraph.text not in target:
+                    target.append(paragraph.text)
+            for table in part.tables:
+                target.append(_docx_block_text(table))
+
+    return "\n".join(header + body + footer)
+
+
+def extract_resume_text(file_obj, file_extension, max_pages=DEFAULT_MAX_PAGES, max_chars=DEFAULT_MAX_CHARS):
+    """
+    Extracts text from a resume file (PDF/DOCX) using fitz and python-docx.
+    Results are memoized on the file's hash, so Streamlit reruns don't re-parse the same upload.
+    :param file_obj: File-like object (e.g. BytesIO) or raw bytes
+    :param file_extension: "pdf" or "docx"
+    :param max_pages: Only the first ``max_pages`` PDF pages are read (None for all)
+    :param max_chars: The text is truncated to this many characters (None for no limit)
+    """
+    if file_extension not in ("pdf", "docx"):
         raise ValueError("Unsupported file format. Please upload a PDF or DOCX file.")
+
+    data = _file_bytes(file_obj)
+    key = (hashlib.sha256(data).hexdigest(), file_extension, max_pages, max_chars)
+    with _cache_lock:
+        if key in _text_cache:
+            _text_cache.move_to_end(key)
+            tracing.incr("cache_lookups", cache="resume_text", result="hit")
+            return _text_cache[key]
+    tracing.incr("cache_lookups", cache="resume_text", result="miss")
+
+    with tracing.span("resume.extract", format=file_extension, bytes=len(data)) as span:
+        if file_extension == "pdf":
+            text = _extract_pdf(data, max_pages, max_chars)
+        else:
+            text = _extract_docx(BytesIO(data))
+
+        text = text.strip()
+        if max_chars:
+            text = text[:max_chars]
+        span["chars"] = len(text)
+
+    with _cache_lock:
+        _text_cache[key] = text
+        while len(_text_cache) > CACHE_SIZE:
+            _text_cache.popitem(last=False)
+    return text
+
+
+def clear_text_cache():
+    """Forget every memoized extraction."""
+    with _cache_lock:
+        _text_cache.clear()
@@ -0,0 +1,223 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import Counter, OrderedDict, namedtuple
+
+from utils import tracing
+from utils.resume_parser import PAGE_BREAK
+
+# Prompt budget for the resume itself; long CVs are cut down to the sections that matter most
+DEFAULT_TOKEN_BUDGET = int(os.environ.get("CAREERGENIE_RESUME_TOKEN_BUDGET", "3000"))
+# Gemini averages about four characters of English per token; close enough for budgeting
+CHARS_PER_TOKEN = 4
+CACHE_SIZE = 32
+# Lines at the top and at the bottom of each page that may be a running header or footer
+RUNNING_LINE_DEPTH = 3
+
+# Canonical section name -> headings that introduce it
+SECTION_HEADINGS = {
+    "Summary": ["summary", "professional summary", "profile", "professional profile", "objective",
+                "career objective", "about me", "about"],
+    "Skills": ["skills", "technical skills", "key skills", "core skills", "core competencies", "competencies",
+               "technologies", "tech stack", "tools"],
+    "Experience": ["experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "career history", "internships", "internship"],
+    "Projects": ["projects", "personal projects", "academic projects", "key projects"],
+    "Education": ["education", "academic background", "academics", "qualifications",
+                  "educational qualifications"],
+    "Certifications": ["certifications", "certificates", "licenses", "courses", "training"],
+    "Achievements": ["achievements", "awards", "honors", "honours", "accomplishments"],
+    "Publications": ["publications", "research", "papers"],
+    "Languages": ["languages"],
+    "Interests": ["interests", "hobbies", "hobbies and interests", "extracurricular activities",
+                  "activities", "volunteering"],
+    "References": ["references"],
+    "Personal": ["personal details", "personal information", "declaration"],
+}
+_HEADING_SECTIONS = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+
+# Sections kept first when the budget is tight; "Header" is the text before the first heading (name, contact)
+SECTION_PRIORITY = ["Header", "Summary", "Skills", "Experience", "Projects", "Education", "Certifications",
+                    "Achievements", "Other", "Publications", "Languages", "Interests", "Personal", "References"]
+
+_PAGE_NUMBER = re.compile(r"^(?:page\s*)?-?\s*\d{1,3}\s*(?:(?:of|/)\s*\d{1,3})?\s*-?$", re.IGNORECASE)
+_HEADING_PUNCTUATION = re.compile(r"[\s:|•·\-–—_=*#]+")
+
+PreparedResume = namedtuple("PreparedResume", ["text", "sections", "original_tokens", "tokens", "truncated",
+                                               "elapsed_ms"])
+PreparedResume.__doc__ = """
+Resume text as sent to the LLM prompts.
+``sections`` is a list of (section name, lines) in document order, before compression;
+``truncated`` names the sections that were shortened or left out to fit the budget.
+"""
+
+_prepared_cache = OrderedDict()  # (sha256, token_budget) -> PreparedResume
+_cache_lock = threading.Lock()
+
+
+def estimate_tokens(text):
+    """Approximate token count of ``text`` for budgeting (no tokenizer call)."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _clean_line(raw_line):
+    """Whitespace collapsed and bullets unified; None for blank lines and page numbers."""
+    line = " ".join(raw_line.split())
+    if not line or _PAGE_NUMBER.match(line):
+        return None
+    return re.sub(r"^[•●▪■◦‣○*·]\s*", "- ", line)
+
+
+def running_lines(pages):
+    """
+    Running headers and footers: the case-folded lines that open or close most pages of a multi-page
+    PDF, in the same place on each, without other lines between them and the page edge. Lines that
+    only repeat within the body (a "Responsibilities:" per role) are not included.
+    :param pages: One list of cleaned lines per page
+    """
+    if len(pages) < 2:
+        return set()
+    edges = []  # per page: (positions from the top, positions from the bottom) with their lines
+    counts = Counter()
+    for lines in pages:
+        depth = min(RUNNING_LINE_DEPTH, len(lines))
+        top = [(position, lines[position].casefold()) for position in range(depth)]
+        bottom = [(-position, lines[-position].casefold()) for position in range(1, depth + 1)]
+        edges.append((top, bottom))
+        counts.update(set(top + bottom))
+
+    min_pages = max(2, (len(pages) + 1) // 2)
+    running = set()
+    for page_edges in edges:
+        for edge in page_edges:
+            for key in edge:  # From the page edge inwards, up to the first line that is not repeated
+                if counts[key] < min_pages:
+                    break
+                running.add(key[1])
+    return running
+
+
+def normalize_lines(resume_text):
+    """
+    Clean extracted resume text into a list of lines: whitespace collapsed, bullets unified, page numbers
+    dropped, running headers and footers kept only once and immediately repeated lines collapsed.
+    """
+    pages = [[line for line in map(_clean_line, page.splitlines()) if line]
+             for page in resume_text.split(PAGE_BREAK)]
+    running = running_lines(pages)
+    lines = []
+    seen_running = set()
+    for line in (line for page_lines in pages for line in page_lines):
+        key = line.casefold()
+        if key in running:
+            if key in seen_running:
+                continue
+            seen_running.add(key)
+        elif lines and key == lines[-1].casefold():
+            continue
+        lines.append(line)
+    return lines
+
+
+def section_of_heading(line):
+    """The canonical section a heading line starts, or None if the line is not a section heading."""
+    if len(line) > 40:
+        return None
+    heading = _HEADING_PUNCTUATION.sub(" ", line).strip().casefold()
+    return _HEADING_SECTIONS.get(heading)
+
+
+def detect_sections(lines):
+    """Split normalized lines into (section name, lines) pairs in document order; headings are kept."""
+    sections = [("Header", [])]
+    for line in lines:
+        section = section_of_heading(line)
+        if section is not None:
+            sections.append((section, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(name, section_lines) for name, section_lines in sections if section_lines]
+
+
+def compress_sections(sections, token_budget):
+    """
+    Fit sections into ``token_budget``, keeping document order. Sections are taken whole in priority
+    order while they fit; the budget left over then goes to the opening lines of the sections that did
+    not (usually the most recent roles of a long Experience section), again in priority order.
+    Returns the kept (section name, lines) pairs and the names of the shortened or dropped sections.
+    """
+    def priority(indexed_section):
+        name = indexed_section[1][0]
+        return SECTION_PRIORITY.index(name) if name in SECTION_PRIORITY else SECTION_PRIORITY.index("Other")
+
+    def cost(line):
+        return estimate_tokens(line) + 1  # +1 for the newline
+
+    kept = {}
+    deferred = []
+    remaining = token_budget
+    for index, (name, section_lines) in sorted(enumerate(sections), key=priority):
+        section_cost = sum(cost(line) for line in section_lines)
+        if section_cost <= remaining:
+            kept[index] = (name, section_lines)
+            remaining -= section_cost
+        else:
+            deferred.append((index, name, section_lines))
+
+    for index, name, section_lines in deferred:
+        taken = []
+        for line in section_lines:
+            if cost(line) > remaining:
+                break
+            taken.append(line)
+            remaining -= cost(line)
+        # A lone heading is not worth its tokens
+        if len(taken) > 1 or (taken and section_of_heading(taken[0]) is None):
+            kept[index] = (name, taken)
+    return [kept[index] for index in sorted(kept)], [name for _, name, _ in deferred]
+
+
+def prepare_resume(resume_text, token_budget=None):
+    """
+    Normalize, sectionize and compress resume text for the LLM prompts.
+    Memoized on the text's hash, so the analysis and improvement prompts share one representation.
+    :param resume_text: Text from utils.resume_parser.extract_resume_text
+    :param token_budget: Maximum estimated tokens of resume text (default DEFAULT_TOKEN_BUDGET)
+    :return: PreparedResume
+    """
+    token_budget = token_budget or DEFAULT_TOKEN_BUDGET
+    key = (hashlib.sha256(resume_text.encode("utf-8")).hexdigest(), token_budget)
+    with _cache_lock:
+        if key in _prepared_cache:
+            _prepared_cache.move_to_end(key)
+            tracing.incr("cache_lookups", cache="prepared_resume", result="hit")
+            return _prepared_cache[key]
+    tracing.incr("cache_lookups", cache="prepared_resume", result="miss")
+
+    started = time.perf_counter()
+    with tracing.span("resume.preprocess", budget=token_budget) as span:
+        original_tokens = estimate_tokens(resume_text)
+        sections = detect_sections(normalize_lines(resume_text))
+        kept, truncated = compress_sections(sections, token_budget)
+        text = "\n".join(line for _, section_lines in kept for line in section_lines)
+        tokens = estimate_tokens(text)
+        span.update(original_tokens=original_tokens, tokens=tokens, sections=len(sections),
+                    truncated=",".join(truncated))
+    tracing.incr("resume_tokens", original_tokens, stage="extracted")
+    tracing.incr("resume_tokens", tokens, stage="prompt")
+
+    prepared = PreparedResume(text, sections, original_tokens, tokens, truncated,
+                              round((time.perf_counter() - started) * 1000, 2))
+    with _cache_lock:
+        _prepared_cache[key] = prepared
+        while len(_prepared_cache) > CACHE_SIZE:
+            _prepared_cache.popitem(last=False)
+    return prepared
+
+
+def clear_prepared_cache():
+    """Forget every memoized preprocessing result."""
+    with _cache_lock:
+        _prepared_cache.clear()
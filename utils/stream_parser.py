@@ -0,0 +1,48 @@
+import json
+import re
+
+_KEY = re.compile(r'\s*,?\s*"((?:[^"\\]|\\.)*)"\s*:\s*')
+_decoder = json.JSONDecoder()
+
+
+class IncrementalJSONParser:
+    """
+    Parses a streamed top-level JSON object field by field.
+
+    Feed it chunks of model output (optionally wrapped in ```json fences); every call returns
+    the ``(key, value)`` pairs whose values became complete, so callers can act on early fields
+    before the rest of the object has arrived.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = None  # Index just after the last parsed value, once the opening brace is seen
+        self.fields = {}
+
+    def feed(self, chunk):
+        """Append ``chunk`` and return the list of newly completed ``(key, value)`` pairs."""
+        self.buffer += chunk
+        completed = []
+
+        if self._pos is None:
+            start = self.buffer.find("{")
+            if start == -1:
+                return completed
+            self._pos = start + 1
+
+        while True:
+            match = _KEY.match(self.buffer, self._pos)
+            if not match:
+                break
+            try:
+                value, end = _decoder.raw_decode(self.buffer, match.end())
+            except json.JSONDecodeError:
+                break  # Value not complete yet
+            if end == len(self.buffer) and isinstance(value, (int, float)):
+                break  # A number at the very end may still be growing
+            key = json.loads(f'"{match.group(1)}"')
+            self.fields[key] = value
+            completed.append((key, value))
+            self._pos = end
+
+        return completed
@@ -0,0 +1,275 @@
+"""
+Lightweight tracing for the analysis pipeline.
+
+``span(name, **attrs)`` times a stage and ``incr(name, value, **labels)`` bumps a counter. Both feed
+the process-wide metrics registry (exposed in Prometheus text format) and, when a run is active, the
+current ``TraceRun`` (one per analysis), which exporters such as ``JsonLinesExporter`` receive when
+the run finishes. Runs are tracked in a context variable; use ``bind`` to carry it into worker threads.
+"""
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+_current_run = contextvars.ContextVar("careergenie_trace_run", default=None)
+_exporters = []
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class MetricsRegistry:
+    """Process-wide counters and span duration totals, across all runs and Streamlit sessions."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}  # (name, labels) -> value
+        self.spans = {}  # (name, labels) -> [count, total_seconds, errors]
+
+    def incr(self, name, value, labels):
+        with self._lock:
+            key = (name, _label_key(labels))
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds, error, labels=()):
+        with self._lock:
+            stats = self.spans.setdefault((name, labels), [0, 0.0, 0])
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] += 1 if error else 0
+
+    def render_prometheus(self):
+        """The registry in Prometheus text exposition format."""
+        def label_text(labels):
+            if not labels:
+                return ""
+            return "{" + ",".join(f'{name}="{value}"' for name, value in labels) + "}"
+
+        lines = []
+        with self._lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                lines.append(f"careergenie_{name}_total{label_text(labels)} {value}")
+            for (name, labels), (count, total, errors) in sorted(self.spans.items()):
+                span_labels = label_text((("span", name),) + labels)
+                lines.append(f"careergenie_span_seconds_count{span_labels} {count}")
+                lines.append(f"careergenie_span_seconds_sum{span_labels} {total:.6f}")
+                lines.append(f"careergenie_span_errors_total{span_labels} {errors}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+class TraceRun:
+    """Spans and counters recorded during one analysis."""
+
+    def __init__(self, name):
+        self.name = name
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started_at = time.time()
+        self.duration = None
+        self.spans = []
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def add_span(self, record):
+        with self._lock:
+            self.spans.append(record)
+
+    def incr(self, name, value, labels):
+        with self._lock:
+            key = (name, _label_key(labels))
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def breakdown(self):
+        """Per-stage totals, slowest first: [{"span", "count", "total_ms", "max_ms", "errors"}]."""
+        stages = {}
+        with self._lock:
+            for record in self.spans:
+                stage = stages.setdefault(record["name"], {"span": record["name"], "count": 0, "total_ms": 0.0,
+                                                           "max_ms": 0.0, "errors": 0})
+                stage["count"] += 1
+                stage["total_ms"] += record["duration_ms"]
+                stage["max_ms"] = max(stage["max_ms"], record["duration_ms"])
+                stage["errors"] += 1 if record["error"] else 0
+        return sorted(({**stage, "total_ms": round(stage["total_ms"], 1), "max_ms": round(stage["max_ms"], 1)}
+                       for stage in stages.values()), key=lambda stage: -stage["total_ms"])
+
+    def counter_rows(self):
+        with self._lock:
+            return [{"counter": name, "labels": ", ".join(f"{k}={v}" for k, v in labels), "value": value}
+                    for (name, labels), value in sorted(self.counters.items())]
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "run_id": self.run_id,
+                "name": self.name,
+                "started_at": self.started_at,
+                "duration_ms": round(self.duration * 1000, 1) if self.duration is not None else None,
+                "spans": list(self.spans),
+                "counters": [{"name": name, "labels": dict(labels), "value": value}
+                             for (name, labels), value in self.counters.items()],
+            }
+
+
+def current_run():
+    return _current_run.get()
+
+
+@contextmanager
+def trace_run(name="analysis"):
+    """Record every span and counter inside the block as one run, then hand it to the exporters."""
+    run = TraceRun(name)
+    token = _current_run.set(run)
+    started = time.perf_counter()
+    try:
+        yield run
+    finally:
+        run.duration = time.perf_counter() - started
+        _current_run.reset(token)
+        for exporter in _exporters:
+            try:
+                exporter.export(run)
+            except Exception as e:
+                logger.warning("Trace exporter %s failed: %s", type(exporter).__name__, e)
+
+
+@contextmanager
+def span(name, **attrs):
+    """
+    Time a stage. Yields the ``attrs`` dict so the block can add details (status, bytes, ...).
+    Exceptions propagate and are recorded on the span.
+    """
+    started = time.perf_counter()
+    error = None
+    try:
+        yield attrs
+    except GeneratorExit:
+        raise  # A streaming consumer stopped early; not a failure
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        record_span(name, started, time.perf_counter() - started, attrs, error)
+
+
+def record_span(name, started, seconds, attrs=None, error=None):
+    """
+    Record a stage the caller timed itself, e.g. only the waits of an interleaved stream.
+    :param started: ``time.perf_counter()`` at the start of the stage
+    :param error: Exception class name if the stage failed
+    """
+    metrics.observe(name, seconds, error)
+    run = _current_run.get()
+    if run is not None:
+        run.add_span({"name": name, "attrs": attrs or {}, "start": started, "duration_ms": round(seconds * 1000, 2),
+                      "thread": threading.current_thread().name, "error": error})
+
+
+def incr(name, value=1, **labels):
+    """Add ``value`` to a counter, e.g. ``incr("http_responses", status=200)``."""
+    metrics.incr(name, value, labels)
+    run = _current_run.get()
+    if run is not None:
+        run.incr(name, value, labels)
+
+
+def record_token_usage(message, model):
+    """Count the LLM tokens reported in a LangChain message's ``usage_metadata`` (when the provider sends it)."""
+    usage = getattr(message, "usage_metadata", None) or {}
+    for kind in ("input_tokens", "output_tokens"):
+        if usage.get(kind):
+            incr("llm_tokens", usage[kind], model=model, kind=kind.split("_")[0])
+
+
+def bind(fn):
+    """Wrap ``fn`` so it runs with the caller's trace context (for thread pools)."""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(fn, *args, **kwargs)
+
+
+class JsonLinesExporter:
+    """Appends every finished run to a JSON lines file."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, run):
+        line = json.dumps(run.to_dict(), default=str)
+        with self._lock:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as trace_file:
+                trace_file.write(line + "\n")
+
+
+class PrometheusExporter:
+    """Serves the process-wide registry as Prometheus text on ``http://host:port/metrics``."""
+
+    def __init__(self, port, host="127.0.0.1"):
+        self.port = port
+        self.host = host
+        self._server = None
+
+    def export(self, run):
+        pass  # Prometheus scrapes the registry; individual runs are not pushed
+
+    def start(self):
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), MetricsHandler)
+        threading.Thread(target=self._server.serve_forever, name="metrics-endpoint", daemon=True).start()
+        return self
+
+
+def add_exporter(exporter):
+    _exporters.append(exporter)
+    return exporter
+
+
+_configured = False
+_configure_lock = threading.Lock()
+
+
+def configure_from_env():
+    """
+    Set up exporters once per process from the environment:
+    ``CAREERGENIE_TRACE_FILE`` (JSON lines path) and ``CAREERGENIE_METRICS_PORT`` (Prometheus endpoint).
+    """
+    global _configured
+    with _configure_lock:
+        if _configured:
+            return
+        _configured = True
+        trace_file = os.environ.get("CAREERGENIE_TRACE_FILE")
+        if trace_file:
+            add_exporter(JsonLinesExporter(trace_file))
+        metrics_port = os.environ.get("CAREERGENIE_METRICS_PORT")
+        if metrics_port:
+            try:
+                add_exporter(PrometheusExporter(int(metrics_port)).start())
+            except OSError as e:
+                logger.warning("Metrics endpoint not started on port %s: %s", metrics_port, e)